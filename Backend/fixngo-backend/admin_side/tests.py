@@ -1,3 +1,82 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from users.models import User, ServiceRequest, Payment
+from workshop.models import Workshop, WorkshopService
+
+
+class DashboardQueryCountTests(TestCase):
+    """The admin dashboard costs the same number of queries however much data there is."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'pw', phone='7000000000', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.seeded = 0
+        cache.clear()
+
+    def seed(self, count):
+        request_statuses = [code for code, _ in ServiceRequest.STATUS_CHOICES]
+        payment_statuses = [code for code, _ in Payment.STATUS_CHOICES]
+        for _ in range(count):
+            self.seeded += 1
+            n = self.seeded
+            user = User.objects.create_user(f"customer{n}", f"customer{n}@example.com", 'pw', phone=f"7{n:09d}")
+            workshop = Workshop.objects.create(
+                name=f"workshop {n}",
+                email=f"workshop{n}@example.com",
+                phone=f"6{n:09d}",
+                location="Kochi",
+            )
+            service = WorkshopService.objects.create(
+                workshop=workshop, name=f"service {n % 7}", description="seeded", base_price=100
+            )
+            request = ServiceRequest.objects.create(
+                user=user, workshop=workshop, workshop_service=service,
+                vehicle_type="car", description="seeded",
+                status=request_statuses[n % len(request_statuses)],
+            )
+            Payment.objects.create(
+                user=user, service_request=request, razorpay_order_id=f"order_{n}",
+                amount=100, platform_fee=10, workshop_amount=90,
+                status=payment_statuses[n % len(payment_statuses)],
+            )
+
+    def count_queries(self):
+        # Bypass the dashboard cache so every call builds from the database
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/admin_side/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_query_count_is_independent_of_data_size(self):
+        self.seed(3)
+        few, data = self.count_queries()
+        self.assertEqual(data['serviceRequestStats']['total'], 3)
+
+        self.seed(3 * 9)
+        many, data = self.count_queries()
+        self.assertEqual(data['serviceRequestStats']['total'], 30)
+        self.assertEqual(data['workshopStats']['total'], 30)
+        self.assertEqual(len(data['recentServiceRequests']), 5)
+        self.assertTrue(all(request['payment'] for request in data['recentServiceRequests']))
+
+        self.assertEqual(few, many)
+
+    def test_pinned_query_count(self):
+        self.seed(10)
+        cache.clear()
+        # Rollup aggregate, workshop aggregate, top services, recent requests
+        # and their payments
+        with self.assertNumQueries(5):
+            self.client.get('/api/admin_side/dashboard/')
+
+    def test_cached_dashboard_skips_the_database(self):
+        self.seed(3)
+        self.count_queries()
+        with self.assertNumQueries(0):
+            self.client.get('/api/admin_side/dashboard/')
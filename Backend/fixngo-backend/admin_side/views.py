@@ -10,10 +10,12 @@ from django.contrib.auth import authenticate
 from workshop.serializers import WorkshopSerializer
 from users.models import User, Payment, ServiceRequest
 from users.serializers import UserSerializer
+from metrics.models import DailyMetrics, PAYMENT_STATUS_FIELDS
+from metrics.cache import ADMIN_SCOPE, cached_dashboard
 from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Count, Sum, F, Value, IntegerField, Q, Case, When, DecimalField
-from django.db.models.functions import TruncMonth, ExtractMonth, Now, Coalesce
+from django.db.models import Count, Sum, F, IntegerField, Q, Case, When, Prefetch
+from django.db.models.functions import TruncMonth, ExtractMonth, Now
 from django.utils import timezone
 from datetime import timedelta
 
@@ -209,57 +211,78 @@ class DashboardAPIView(APIView):
     permission_classes = [IsAdminUser]
     
     def get(self, request):
+        # Served from the dashboard cache, rebuilt after relevant writes
+        dashboard_data = cached_dashboard(ADMIN_SCOPE, 'overview', self.build_dashboard)
+        return Response(dashboard_data, status=status.HTTP_200_OK)
+    
+    def build_dashboard(self):
         today = timezone.now()
         last_month = today - timedelta(days=30)
         last_week = today - timedelta(days=7)
         
+        # Month boundaries for the user growth chart (last 6 months)
+        growth_months = [today - timedelta(days=30 * i) for i in range(5, -1, -1)]
+        
+        # User, request and revenue figures come from the platform-wide rows
+        # of the daily rollup, so this costs one row per day, not per record
+        def metric_sum(field, **filters):
+            return Sum(field, filter=Q(**filters)) if filters else Sum(field)
+        
+        before_last_month = {'date__lt': timezone.localdate(last_month)}
+        metrics = DailyMetrics.objects.filter(workshop__isnull=True).aggregate(
+            total_users=metric_sum('active_signups'),
+            last_month_users=metric_sum('active_signups', **before_last_month),
+            total_requests=metric_sum('requests'),
+            last_month_requests=metric_sum('requests', **before_last_month),
+            new_requests=metric_sum('requests_pending'),
+            in_progress_requests=metric_sum('requests_in_progress'),
+            completed_requests=metric_sum('requests_completed'),
+            last_month_revenue=metric_sum('revenue', **before_last_month),
+            last_month_platform_fee=metric_sum('platform_fee', **before_last_month),
+            **{
+                field: metric_sum(field)
+                for fields in PAYMENT_STATUS_FIELDS.values()
+                for field in fields
+            },
+            **{
+                f'month_{i}': metric_sum('signups', date__lte=timezone.localdate(month_date))
+                for i, month_date in enumerate(growth_months)
+            }
+        )
+        metrics = {name: value or 0 for name, value in metrics.items()}
+        
         # Get user statistics
-        total_users = User.objects.filter(is_active=True).count()
-        last_month_users = User.objects.filter(created_at__lt=last_month, is_active=True).count()
+        total_users = metrics['total_users']
+        last_month_users = metrics['last_month_users']
         user_growth_pct = round(((total_users - last_month_users) / max(last_month_users, 1)) * 100, 1)
         
         # Get workshop statistics
-        total_workshops = Workshop.objects.filter(is_active=True).count()
-        new_workshops = Workshop.objects.filter(created_at__gte=last_week).count()
-        pending_workshops = Workshop.objects.filter(approval_status='pending').count()
+        workshop_stats = Workshop.objects.aggregate(
+            total=Count('id', filter=Q(is_active=True)),
+            new=Count('id', filter=Q(created_at__gte=last_week)),
+            pending=Count('id', filter=Q(approval_status='pending')),
+        )
+        total_workshops = workshop_stats['total']
+        new_workshops = workshop_stats['new']
+        pending_workshops = workshop_stats['pending']
         
         # Get service request statistics
-        total_service_requests = ServiceRequest.objects.count()
-        last_month_requests = ServiceRequest.objects.filter(created_at__lt=last_month).count()
+        total_service_requests = metrics['total_requests']
+        last_month_requests = metrics['last_month_requests']
         request_growth_pct = round(((total_service_requests - last_month_requests) / max(last_month_requests, 1)) * 100, 1)
         
-        new_requests = ServiceRequest.objects.filter(status='PENDING').count()
-        in_progress_requests = ServiceRequest.objects.filter(status='IN_PROGRESS').count()
-        completed_requests = ServiceRequest.objects.filter(status='COMPLETED').count()
-        
-        # Get revenue statistics - with admin fees broken out
-        successful_payments = Payment.objects.filter(status='SUCCESS')
-        
-        # Total revenue
-        total_revenue = successful_payments.aggregate(
-            total=Coalesce(Sum('amount'), Value(0), output_field=DecimalField())
-        )['total']
+        new_requests = metrics['new_requests']
+        in_progress_requests = metrics['in_progress_requests']
+        completed_requests = metrics['completed_requests']
         
-        # Admin fee revenue
-        admin_fee_revenue = successful_payments.aggregate(
-            total=Coalesce(Sum('platform_fee'), Value(0), output_field=DecimalField())
-        )['total']
-        
-        # Workshop revenue
-        workshop_revenue = successful_payments.aggregate(
-            total=Coalesce(Sum('workshop_amount'), Value(0), output_field=DecimalField())
-        )['total']
+        # Total revenue, admin fee revenue and workshop revenue
+        total_revenue = metrics['revenue']
+        admin_fee_revenue = metrics['platform_fee']
+        workshop_revenue = metrics['workshop_amount']
         
         # Calculate last month's revenue 
-        last_month_payments = successful_payments.filter(created_at__lt=last_month)
-        
-        last_month_revenue = last_month_payments.aggregate(
-            total=Coalesce(Sum('amount'), Value(0), output_field=DecimalField())
-        )['total']
-        
-        last_month_admin_fee = last_month_payments.aggregate(
-            total=Coalesce(Sum('platform_fee'), Value(0), output_field=DecimalField())
-        )['total']
+        last_month_revenue = metrics['last_month_revenue']
+        last_month_admin_fee = metrics['last_month_platform_fee']
         
         # Handle division by zero and calculate growth
         if float(last_month_revenue) > 0:
@@ -270,15 +293,8 @@ class DashboardAPIView(APIView):
             admin_fee_growth_pct = 100.0 if float(admin_fee_revenue) > 0 else 0.0
         
         # Pending revenue
-        pending_payments = Payment.objects.filter(status='PENDING')
-        
-        pending_revenue = pending_payments.aggregate(
-            total=Coalesce(Sum('amount'), Value(0), output_field=DecimalField())
-        )['total']
-        
-        pending_admin_fee = pending_payments.aggregate(
-            total=Coalesce(Sum('platform_fee'), Value(0), output_field=DecimalField())
-        )['total']
+        pending_revenue = metrics['pending_revenue']
+        pending_admin_fee = metrics['pending_platform_fee']
         
         # Get service distribution data
         service_distribution = []
@@ -313,41 +329,21 @@ class DashboardAPIView(APIView):
         # Get payment distribution with platform fee breakdown
         payment_distribution = []
         for status_code, label in Payment.STATUS_CHOICES:
-            # Get total amount
-            amount = Payment.objects.filter(status=status_code).aggregate(
-                total=Coalesce(Sum('amount'), Value(0), output_field=DecimalField())
-            )['total']
-            
-            # Split into platform fee and workshop amounts
-            platform_fee = Payment.objects.filter(status=status_code).aggregate(
-                total=Coalesce(Sum('platform_fee'), Value(0), output_field=DecimalField())
-            )['total']
-            
-            workshop_amount = Payment.objects.filter(status=status_code).aggregate(
-                total=Coalesce(Sum('workshop_amount'), Value(0), output_field=DecimalField())
-            )['total']
-            
+            amount_field, fee_field, workshop_field = PAYMENT_STATUS_FIELDS[status_code]
             payment_distribution.append({
                 'name': label,
                 'status': status_code,
-                'value': float(amount),
-                'platformFee': float(platform_fee),
-                'workshopAmount': float(workshop_amount)
+                'value': float(metrics[amount_field]),
+                'platformFee': float(metrics[fee_field]),
+                'workshopAmount': float(metrics[workshop_field])
             })
         
         # Get user growth data (monthly for the last 6 months)
         user_growth = []
-        for i in range(5, -1, -1):
-            month_date = today - timedelta(days=30 * i)
-            month_name = month_date.strftime('%b')
-            
-            user_count = User.objects.filter(
-                created_at__lte=month_date
-            ).count()
-            
+        for i, month_date in enumerate(growth_months):
             user_growth.append({
-                'month': month_name,
-                'count': user_count
+                'month': month_date.strftime('%b'),
+                'count': metrics[f'month_{i}']
             })
         
         # Get paginated recent service requests
@@ -357,6 +353,8 @@ class DashboardAPIView(APIView):
         
         for req in ServiceRequest.objects.select_related(
             'user', 'workshop', 'workshop_service'
+        ).prefetch_related(
+            Prefetch('payments', queryset=Payment.objects.order_by('id'))
         ).order_by('-created_at')[:limit]:
             # Handle potential None values or missing attributes
             try:
@@ -378,7 +376,8 @@ class DashboardAPIView(APIView):
                 # Get payment information if available
                 payment_info = {}
                 try:
-                    payment = Payment.objects.filter(service_request=req).first()
+                    payments = req.payments.all()
+                    payment = payments[0] if payments else None
                     if payment:
                         payment_info = {
                             'amount': float(payment.amount),
@@ -442,7 +441,7 @@ class DashboardAPIView(APIView):
             'recentServiceRequests': recent_requests
         }
         
-        return Response(dashboard_data, status=status.HTTP_200_OK)
+        return dashboard_data
     
 class ServiceRequestListAPIView(APIView):
     """API endpoint to provide paginated service requests for the admin dashboard"""
@@ -459,6 +458,8 @@ class ServiceRequestListAPIView(APIView):
         # Get paginated service requests
         requests_queryset = ServiceRequest.objects.select_related(
             'user', 'workshop', 'workshop_service'
+        ).prefetch_related(
+            Prefetch('payments', queryset=Payment.objects.order_by('id'))
         ).order_by('-created_at')[offset:offset + limit]
         
         # Format requests data
@@ -484,7 +485,8 @@ class ServiceRequestListAPIView(APIView):
                 # Get payment information if available
                 payment_info = {}
                 try:
-                    payment = Payment.objects.filter(service_request=req).first()
+                    payments = req.payments.all()
+                    payment = payments[0] if payments else None
                     if payment:
                         payment_info = {
                             'amount': float(payment.amount),
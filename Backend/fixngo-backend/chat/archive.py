@@ -0,0 +1,56 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from chat.models import Message, ArchivedMessage
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_FIELDS = [
+    'id', 'sender_user_id', 'sender_workshop_id', 'receiver_user_id', 'receiver_workshop_id',
+    'room_name', 'room_user_id', 'room_workshop_id', 'message', 'timestamp', 'is_read',
+]
+
+
+def archive_cutoff_id(older_than_days=None):
+    """Id of the newest message old enough to archive, or None."""
+    days = settings.CHAT_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = timezone.now() - timedelta(days=days)
+    return Message.objects.filter(timestamp__lt=cutoff).aggregate(last_id=Max('id'))['last_id']
+
+
+def archive_messages(older_than_days=None, batch_size=None):
+    """
+    Move messages older than `older_than_days` from Message into
+    ArchivedMessage, oldest first, one batch per transaction. Returns the
+    number of messages moved.
+    """
+    batch_size = batch_size or settings.CHAT_ARCHIVE_BATCH_SIZE
+
+    # Archiving by id (rather than timestamp) keeps every archived id below
+    # the ids still in Message, which lets history cursors span both tables
+    last_id = archive_cutoff_id(older_than_days)
+    if last_id is None:
+        return 0
+
+    moved = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Message.objects.filter(id__lte=last_id).order_by('id').values(*ARCHIVED_FIELDS)[:batch_size]
+            )
+            if not batch:
+                break
+
+            ArchivedMessage.objects.bulk_create(
+                [ArchivedMessage(month=row['timestamp'].date().replace(day=1), **row) for row in batch],
+                ignore_conflicts=True,
+            )
+            Message.objects.filter(id__in=[row['id'] for row in batch]).delete()
+
+        moved += len(batch)
+        logger.info("Archived %d chat messages (up to id %d)", moved, batch[-1]['id'])
+
+    return moved
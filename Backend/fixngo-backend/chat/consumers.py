@@ -1,90 +1,174 @@
 import json
+import time
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django.utils.timezone import now
-from chat.models import Message
+from chat.models import build_room_name
 from users.models import User
 from workshop.models import Workshop
 from channels.db import database_sync_to_async
+from chat.write_buffer import message_buffer
+from chat.presence import presence, presence_member
+from django.conf import settings
 
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.user_id = self.scope["url_route"]["kwargs"]["user_id"]
         self.workshop_id = self.scope["url_route"]["kwargs"]["workshop_id"]
-        self.room_name = f"chat_{self.user_id}_{self.workshop_id}"
+        self.room_name = build_room_name(self.user_id, self.workshop_id)
         self.room_group_name = self.room_name
 
+        # Resolve the room's participants once, and only let them in
+        if not await self.resolve_participants():
+            await self.close(code=4003)
+            return
+
         # Join room group
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
 
+        # Announce ourselves and hand the newcomer the room's current presence
+        self.member = presence_member(self.sender_user, self.sender_workshop)
+        self.is_typing = False
+        self.typing_sent_at = 0.0
+        self.heartbeat_at = time.monotonic()
+        online = await presence.join(self.room_name, self.member)
+        if online is not None:
+            await self.send(text_data=json.dumps({"type": "presence_state", "online": online}))
+        await self.broadcast_presence("online")
+
+    async def resolve_participants(self):
+        user = self.scope["user"]
+        self.sender_user = None
+        self.sender_workshop = None
+        self.receiver_user = None
+        self.receiver_workshop = None
+
+        if not user.is_authenticated:
+            return False
+
+        # A user chats with the room's workshop, a workshop with the room's user
+        if isinstance(user, User) and user.id == int(self.user_id):
+            self.sender_user = user
+            if int(self.workshop_id) > 0:
+                self.receiver_workshop = await self.get_workshop(int(self.workshop_id))
+            else:
+                self.receiver_user = await self.get_user(int(self.user_id))
+        elif isinstance(user, Workshop) and user.id == int(self.workshop_id):
+            self.sender_workshop = user
+            self.receiver_user = await self.get_user(int(self.user_id))
+        else:
+            return False
+
+        return bool(self.receiver_user or self.receiver_workshop)
+
     async def disconnect(self, close_code):
         # Leave room group
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+        if getattr(self, "member", None):
+            await presence.leave(self.room_name, self.member)
+            await self.broadcast_presence("offline")
+        # Make sure nothing this process buffered is lost with the connection
+        await message_buffer.flush()
 
     async def receive(self, text_data):
         data = json.loads(text_data)
+
+        # Any frame proves the member is still here, not just heartbeats
+        event_type = data.get('type')
+        await self.refresh_presence(force=event_type == 'heartbeat')
+
+        # Presence traffic never touches the database
+        if event_type == 'heartbeat':
+            return
+        if event_type == 'typing':
+            await self.update_typing(bool(data.get('is_typing', True)))
+            return
+
         message = data['message']
+        # Sending ends the typing state; clients clear it on the message itself
+        self.is_typing = False
         temporary_id = data.get('temporary_id')
         user = self.scope["user"]
+
+        # Participants were resolved in connect(), so no lookups happen here
+        sender_id = self.sender_user.id if self.sender_user else self.sender_workshop.id
+
+        # Save message to database
+        message_obj = await self.save_message(
+            self.sender_user, 
+            self.sender_workshop, 
+            self.receiver_user, 
+            self.receiver_workshop, 
+            message
+        )
         
-        if user.is_authenticated:
-            # Determine if the authenticated user is a regular user or workshop
-            sender_user = user if isinstance(user, User) else None
-            sender_workshop = user if isinstance(user, Workshop) else None
-            
-            # Determine the sender's ID for the message
-            sender_id = sender_user.id if sender_user else sender_workshop.id if sender_workshop else None
-            
-            # Determine receiver (whether it's a user-to-workshop or user-to-user chat)
-            receiver_user = None
-            receiver_workshop = None
-            
-            # If sender is a user, the other party is determined by workshop_id
-            if sender_user:
-                if int(self.workshop_id) > 0:
-                    receiver_workshop = await self.get_workshop(int(self.workshop_id))
-                else:
-                    receiver_user = await self.get_user(int(self.user_id))
-            # If sender is a workshop, the receiver is the user
-            elif sender_workshop:
-                receiver_user = await self.get_user(int(self.user_id))
-            
-            # Save message to database
-            message_obj = await self.save_message(
-                sender_user, 
-                sender_workshop, 
-                receiver_user, 
-                receiver_workshop, 
-                message
-            )
-            
-            # Send message to room group
-            timestamp = now()
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    "type": "chat_message",
-                    "message": message,
-                    "username": user.email,
-                    "sender_id": sender_id,
-                    "timestamp": str(timestamp),
-                    "message_id": message_obj.id if message_obj else None,
-                    "temporary_id": temporary_id
-                }
-            )
+        # Send message to room group
+        timestamp = now()
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {
+                "type": "chat_message",
+                "message": message,
+                "username": user.email,
+                "sender_id": sender_id,
+                "timestamp": str(timestamp),
+                "message_id": message_obj.id if message_obj else None,
+                "temporary_id": temporary_id
+            }
+        )
 
     async def chat_message(self, event):
         # Send message to WebSocket
         await self.send(text_data=json.dumps(event))
 
-    @database_sync_to_async
-    def save_message(self, sender_user, sender_workshop, receiver_user, receiver_workshop, message):
-        return Message.objects.create(
+    async def refresh_presence(self, force=False):
+        # Chatty frames (keystrokes, messages) refresh at most a few times per
+        # TTL; the key only has to outlive the gap between two refreshes
+        now_ts = time.monotonic()
+        if force or now_ts - self.heartbeat_at >= settings.CHAT_PRESENCE_TTL / 3:
+            self.heartbeat_at = now_ts
+            await presence.heartbeat(self.room_name, self.member)
+
+    async def update_typing(self, is_typing):
+        # Throttled: a stream of keystrokes re-announces "typing" at most once
+        # per CHAT_TYPING_THROTTLE seconds, and "stopped" only after "typing"
+        now_ts = time.monotonic()
+        if is_typing and self.is_typing and now_ts - self.typing_sent_at < settings.CHAT_TYPING_THROTTLE:
+            return
+        if not is_typing and not self.is_typing:
+            return
+
+        self.is_typing = is_typing
+        self.typing_sent_at = now_ts
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {"type": "typing_event", "member": self.member, "is_typing": is_typing}
+        )
+
+    async def broadcast_presence(self, status):
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {"type": "presence_event", "member": self.member, "status": status}
+        )
+
+    async def presence_event(self, event):
+        await self.send(text_data=json.dumps(event))
+
+    async def typing_event(self, event):
+        # The typist doesn't need its own indicator echoed back
+        if event["member"] != self.member:
+            await self.send(text_data=json.dumps(event))
+
+    async def save_message(self, sender_user, sender_workshop, receiver_user, receiver_workshop, message):
+        # Buffered write: resolves once the batch holding this message is stored
+        return await message_buffer.save(
             sender_user=sender_user,
             sender_workshop=sender_workshop,
             receiver_user=receiver_user,
             receiver_workshop=receiver_workshop,
             room_name=self.room_name,
+            room_user_id=int(self.user_id),
+            room_workshop_id=int(self.workshop_id),
             message=message,
         )
 
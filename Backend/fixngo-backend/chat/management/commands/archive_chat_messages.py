@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from chat.archive import archive_cutoff_id, archive_messages
+from chat.models import Message
+
+
+class Command(BaseCommand):
+    help = "Move chat messages older than CHAT_ARCHIVE_AFTER_DAYS into the archive table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.CHAT_ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=settings.CHAT_ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            last_id = archive_cutoff_id(options['days'])
+            count = Message.objects.filter(id__lte=last_id).count() if last_id is not None else 0
+            self.stdout.write(f"{count} messages would be archived")
+            return
+
+        moved = archive_messages(options['days'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} messages"))
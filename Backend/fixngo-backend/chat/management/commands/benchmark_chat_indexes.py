@@ -0,0 +1,152 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from chat.models import Message
+from users.models import User
+from workshop.models import Workshop
+
+
+CHAT_INDEXES = [
+    'chat_msg_room_time_idx',
+    'chat_msg_room_key_idx',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed chat messages inside a rolled-back transaction and compare query "
+        "plans for the chat endpoints with and without the chat.Message indexes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=1_000_000)
+        parser.add_argument('--rooms', type=int, default=5_000)
+        parser.add_argument('--users', type=int, default=1_000)
+        parser.add_argument('--workshops', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("benchmark_chat_indexes needs PostgreSQL (EXPLAIN ANALYZE and transactional DDL)")
+
+        # Everything below, including the dropped indexes, is rolled back
+        with transaction.atomic():
+            user_ids = self.seed_users(options['users'])
+            workshop_ids = self.seed_workshops(options['workshops'])
+            self.stdout.write(f"Seeding {options['messages']:,} messages across {options['rooms']:,} rooms...")
+            self.seed_messages(user_ids, workshop_ids, options)
+
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {Message._meta.db_table}")
+
+            queries = self.sample_queries(user_ids[0], workshop_ids[0])
+            indexed = {name: self.explain(queryset, options['repeat']) for name, queryset in queries}
+
+            with connection.cursor() as cursor:
+                for index in CHAT_INDEXES:
+                    cursor.execute(f"DROP INDEX {index}")
+            unindexed = {name: self.explain(queryset, options['repeat']) for name, queryset in queries}
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{'query':<18} {'no index (ms)':>14} {'indexed (ms)':>13} {'speedup':>9}  plan")
+        for name, _ in queries:
+            before_ms, before_plan = unindexed[name]
+            after_ms, after_plan = indexed[name]
+            self.stdout.write(
+                f"{name:<18} {before_ms:>14.2f} {after_ms:>13.2f} {before_ms / after_ms:>8.1f}x  "
+                f"{before_plan} -> {after_plan}"
+            )
+
+    def seed_users(self, count):
+        users = User.objects.bulk_create([
+            User(
+                username=f"chat-bench-{i}",
+                email=f"chat-bench-{i}@example.com",
+                phone=f"bench{i}",
+                profile_image_url="",
+            )
+            for i in range(count)
+        ])
+        return [user.id for user in users]
+
+    def seed_workshops(self, count):
+        workshops = Workshop.objects.bulk_create([
+            Workshop(
+                name=f"chat-bench-{i}",
+                email=f"chat-bench-{i}@example.com",
+                phone=f"bench{i}",
+                location="benchmark",
+                profile_image="",
+            )
+            for i in range(count)
+        ])
+        return [workshop.id for workshop in workshops]
+
+    def seed_messages(self, user_ids, workshop_ids, options):
+        # generate_series keeps a million-row seed to a single statement;
+        # even rows go user -> workshop, odd rows workshop -> user
+        sql = f"""
+            INSERT INTO {Message._meta.db_table} (
+                room_name, room_user_id, room_workshop_id,
+                sender_user_id, sender_workshop_id, receiver_user_id, receiver_workshop_id,
+                message, timestamp, is_read
+            )
+            SELECT
+                'chat_' || u || '_' || w, u, w,
+                CASE WHEN g %% 2 = 0 THEN u END,
+                CASE WHEN g %% 2 = 1 THEN w END,
+                CASE WHEN g %% 2 = 1 THEN u END,
+                CASE WHEN g %% 2 = 0 THEN w END,
+                'benchmark message ' || g,
+                now() - (%(messages)s - g) * interval '1 second',
+                false
+            FROM (
+                SELECT
+                    g,
+                    (%(user_ids)s::bigint[])[1 + (g %% %(rooms)s) %% %(user_count)s] AS u,
+                    (%(workshop_ids)s::bigint[])[1 + ((g %% %(rooms)s) / %(user_count)s) %% %(workshop_count)s] AS w
+                FROM generate_series(1, %(messages)s) AS g
+            ) seeded
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {
+                'messages': options['messages'],
+                'rooms': options['rooms'],
+                'user_ids': user_ids,
+                'workshop_ids': workshop_ids,
+                'user_count': len(user_ids),
+                'workshop_count': len(workshop_ids),
+            })
+
+    def sample_queries(self, user_id, workshop_id):
+        # The shapes the chat endpoints issue, against the busiest room
+        room = Message.objects.filter(room_user_id=user_id, room_workshop_id=workshop_id)
+        return [
+            ('history page', room.order_by('-id').values('id')[:50]),
+            ('history by name', Message.objects.filter(
+                room_name=f"chat_{user_id}_{workshop_id}"
+            ).order_by('-timestamp').values('id')[:50]),
+        ]
+
+    def explain(self, queryset, repeat):
+        sql, params = queryset.query.sql_with_params()
+        timings = []
+        with connection.cursor() as cursor:
+            for _ in range(repeat):
+                cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                timings.append(plan[0]['Execution Time'])
+        return min(timings), self.describe(plan[0]['Plan'])
+
+    def describe(self, node):
+        # The first scan node tells whether an index was used
+        while node.get('Plans') and 'Scan' not in node['Node Type']:
+            node = node['Plans'][0]
+        if 'Index Name' in node:
+            return f"{node['Node Type']} using {node['Index Name']}"
+        return node['Node Type']
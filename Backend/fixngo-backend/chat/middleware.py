@@ -3,8 +3,7 @@ from django.conf import settings
 from channels.middleware import BaseMiddleware
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import AnonymousUser
-from users.models import User
-from workshop.models import Workshop
+from utils.principal_cache import get_principal
 
 class JWTAuthMiddleware(BaseMiddleware):
     """
@@ -41,9 +40,7 @@ class JWTAuthMiddleware(BaseMiddleware):
             if not user_id:
                 return AnonymousUser()
 
-            if user_type == "workshop":
-                return Workshop.objects.get(id=user_id)
-            else:
-                return User.objects.get(id=user_id)
-        except (jwt.InvalidTokenError, User.DoesNotExist, Workshop.DoesNotExist, KeyError):
+            principal = get_principal("workshop" if user_type == "workshop" else "user", user_id)
+            return principal or AnonymousUser()
+        except (jwt.InvalidTokenError, KeyError):
             return AnonymousUser()
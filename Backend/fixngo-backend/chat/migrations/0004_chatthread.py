@@ -0,0 +1,59 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def backfill_chat_threads(apps, schema_editor):
+    Message = apps.get_model('chat', 'Message')
+    ChatThread = apps.get_model('chat', 'ChatThread')
+    rooms = Message.objects.values('room_name').annotate(
+        sender=Max('sender_user'),
+        receiver=Max('receiver_user'),
+        sending_workshop=Max('sender_workshop'),
+        receiving_workshop=Max('receiver_workshop'),
+        user_unread=Count('id', filter=Q(receiver_user__isnull=False, is_read=False)),
+        workshop_unread=Count('id', filter=Q(receiver_workshop__isnull=False, is_read=False)),
+    )
+    for room in rooms.iterator():
+        latest = Message.objects.filter(room_name=room['room_name']).order_by('-timestamp').first()
+        ChatThread.objects.create(
+            room_name=room['room_name'],
+            user_id=room['sender'] or room['receiver'],
+            workshop_id=room['sending_workshop'] or room['receiving_workshop'],
+            last_message=latest.message,
+            last_timestamp=latest.timestamp,
+            user_unread_count=room['user_unread'],
+            workshop_unread_count=room['workshop_unread'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_alter_message_options'),
+        ('workshop', '0029_geocodecache'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatThread',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_name', models.CharField(max_length=255, unique=True)),
+                ('last_message', models.TextField(blank=True, default='')),
+                ('last_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('user_unread_count', models.PositiveIntegerField(default=0)),
+                ('workshop_unread_count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='chat_threads', to=settings.AUTH_USER_MODEL)),
+                ('workshop', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='chat_threads', to='workshop.workshop')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-last_timestamp'], name='chatthread_user_recent_idx'), models.Index(fields=['workshop', '-last_timestamp'], name='chatthread_workshop_recent_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_chat_threads, migrations.RunPython.noop),
+    ]
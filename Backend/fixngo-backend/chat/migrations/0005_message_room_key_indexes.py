@@ -0,0 +1,65 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Frozen copy of chat.models.parse_room_name, so later changes to the app
+# code cannot alter what this migration does
+def parse_room_name(room_name):
+    prefix, user_id, workshop_id = room_name.split('_')
+    if prefix != 'chat':
+        raise ValueError(f"Invalid room name: {room_name}")
+    return int(user_id), int(workshop_id)
+
+
+def backfill_room_key(apps, schema_editor):
+    Message = apps.get_model('chat', 'Message')
+    room_names = Message.objects.values_list('room_name', flat=True).distinct()
+    for room_name in list(room_names):
+        try:
+            user_id, workshop_id = parse_room_name(room_name)
+        except ValueError:
+            continue
+        Message.objects.filter(room_name=room_name).update(
+            room_user_id=user_id, room_workshop_id=workshop_id
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_chatthread'),
+        ('workshop', '0029_geocodecache'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='room_user_id',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='room_workshop_id',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_room_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['room_name', 'timestamp'], name='chat_msg_room_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['room_user_id', 'room_workshop_id', 'id'], name='chat_msg_room_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['receiver_user', 'room_workshop_id'], name='chat_msg_unread_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['receiver_workshop', 'room_user_id'], name='chat_msg_unread_workshop_idx'),
+        ),
+    ]
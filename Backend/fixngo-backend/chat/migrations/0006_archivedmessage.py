@@ -0,0 +1,39 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_message_room_key_indexes'),
+        ('workshop', '0029_geocodecache'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMessage',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('room_name', models.CharField(max_length=255)),
+                ('room_user_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('room_workshop_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('message', models.TextField()),
+                ('timestamp', models.DateTimeField()),
+                ('is_read', models.BooleanField(default=False)),
+                ('month', models.DateField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('receiver_user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('receiver_workshop', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='workshop.workshop')),
+                ('sender_user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('sender_workshop', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='workshop.workshop')),
+            ],
+            options={
+                'ordering': ['timestamp'],
+                'indexes': [models.Index(fields=['room_user_id', 'room_workshop_id', 'id'], name='chat_archive_room_key_idx'), models.Index(fields=['month'], name='chat_archive_month_idx')],
+            },
+        ),
+    ]
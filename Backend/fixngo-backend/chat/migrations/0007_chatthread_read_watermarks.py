@@ -0,0 +1,102 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:28
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def backfill_read_watermarks(apps, schema_editor):
+    ChatThread = apps.get_model('chat', 'ChatThread')
+    received = dict(
+        user=Count('id', filter=Q(receiver_user__isnull=False)),
+        workshop=Count('id', filter=Q(receiver_workshop__isnull=False)),
+        last_id=Max('id'),
+        user_read_id=Max('id', filter=Q(receiver_user__isnull=False, is_read=True)),
+        workshop_read_id=Max('id', filter=Q(receiver_workshop__isnull=False, is_read=True)),
+    )
+    rooms = {}
+    for model_name in ('ArchivedMessage', 'Message'):
+        model = apps.get_model('chat', model_name)
+        for row in model.objects.values('room_name').annotate(**received):
+            room = rooms.setdefault(row['room_name'], {'user': 0, 'workshop': 0})
+            room['user'] += row['user']
+            room['workshop'] += row['workshop']
+            # Archived ids sit below live ones, so later rows win
+            for key in ('last_id', 'user_read_id', 'workshop_read_id'):
+                if row[key] is not None:
+                    room[key] = row[key]
+
+    for thread in ChatThread.objects.all().iterator():
+        room = rooms.get(thread.room_name)
+        if room is None:
+            continue
+        thread.last_message_id = room.get('last_id')
+        thread.user_message_count = room['user']
+        thread.workshop_message_count = room['workshop']
+        # Whatever was unread under the old counters stays unread
+        thread.user_read_count = max(room['user'] - thread.user_unread_count, 0)
+        thread.workshop_read_count = max(room['workshop'] - thread.workshop_unread_count, 0)
+        thread.user_last_read_id = room.get('user_read_id')
+        thread.workshop_last_read_id = room.get('workshop_read_id')
+        thread.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0006_archivedmessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatthread',
+            name='last_message_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatthread',
+            name='user_last_read_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatthread',
+            name='user_message_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chatthread',
+            name='user_read_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chatthread',
+            name='workshop_last_read_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatthread',
+            name='workshop_message_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chatthread',
+            name='workshop_read_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_read_watermarks, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='chatthread',
+            name='user_unread_count',
+        ),
+        migrations.RemoveField(
+            model_name='chatthread',
+            name='workshop_unread_count',
+        ),
+        migrations.RemoveIndex(
+            model_name='message',
+            name='chat_msg_unread_user_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='message',
+            name='chat_msg_unread_workshop_idx',
+        ),
+    ]
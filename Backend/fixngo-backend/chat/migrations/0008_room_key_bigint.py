@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0007_chatthread_read_watermarks'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedmessage',
+            name='room_user_id',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='archivedmessage',
+            name='room_workshop_id',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='message',
+            name='room_user_id',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='message',
+            name='room_workshop_id',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,8 +1,21 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from users.models import User
 from workshop.models import Workshop
 from django.utils import timezone
 
+def build_room_name(user_id, workshop_id):
+    return f"chat_{user_id}_{workshop_id}"
+
+
+def parse_room_name(room_name):
+    """Split `chat_<user_id>_<workshop_id>` into its ids, or raise ValueError."""
+    prefix, user_id, workshop_id = room_name.split('_')
+    if prefix != 'chat':
+        raise ValueError(f"Invalid room name: {room_name}")
+    return int(user_id), int(workshop_id)
+
+
 class Message(models.Model):
     sender_user = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE, related_name="sent_messages")
     sender_workshop = models.ForeignKey(Workshop, null=True, blank=True, on_delete=models.CASCADE, related_name="sent_messages_workshop")
@@ -11,10 +24,137 @@ class Message(models.Model):
     room_name = models.CharField(max_length=255)
     message = models.TextField()
     timestamp = models.DateTimeField(default=timezone.now)
+    # Superseded by the ChatThread read watermarks; only historical rows set it
     is_read = models.BooleanField(default=False)
+    # Typed copy of the ids encoded in room_name
+    room_user_id = models.PositiveBigIntegerField(null=True, blank=True)
+    room_workshop_id = models.PositiveBigIntegerField(null=True, blank=True)
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['room_name', 'timestamp'], name='chat_msg_room_time_idx'),
+            models.Index(fields=['room_user_id', 'room_workshop_id', 'id'], name='chat_msg_room_key_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sender_user or self.sender_workshop} -> {self.receiver_user or self.receiver_workshop}: {self.message}"
+
+    def fill_room_key(self):
+        if self.room_user_id is None or self.room_workshop_id is None:
+            self.room_user_id, self.room_workshop_id = parse_room_name(self.room_name)
+
+    def save(self, *args, **kwargs):
+        self.fill_room_key()
+        super().save(*args, **kwargs)
+
+
+
+class ArchivedMessage(models.Model):
+    """
+    Messages moved out of the hot Message table by `archive_messages`. Ids
+    are kept from the original rows so history cursors keep working across
+    the two tables; `month` buckets rows for pruning and export.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    sender_user = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+    sender_workshop = models.ForeignKey(Workshop, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+    receiver_user = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+    receiver_workshop = models.ForeignKey(Workshop, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+    room_name = models.CharField(max_length=255)
+    room_user_id = models.PositiveBigIntegerField(null=True, blank=True)
+    room_workshop_id = models.PositiveBigIntegerField(null=True, blank=True)
+    message = models.TextField()
+    timestamp = models.DateTimeField()
+    is_read = models.BooleanField(default=False)
+    month = models.DateField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['room_user_id', 'room_workshop_id', 'id'], name='chat_archive_room_key_idx'),
+            models.Index(fields=['month'], name='chat_archive_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"[archived] {self.sender_user or self.sender_workshop} -> {self.receiver_user or self.receiver_workshop}: {self.message}"
+
+
+class ChatThread(models.Model):
+    """
+    One row per room, kept current as messages are stored and read so that
+    thread lists never have to scan the message table.
+    """
+    room_name = models.CharField(max_length=255, unique=True)
+    user = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE, related_name="chat_threads")
+    workshop = models.ForeignKey(Workshop, null=True, blank=True, on_delete=models.CASCADE, related_name="chat_threads")
+    last_message = models.TextField(blank=True, default='')
+    last_timestamp = models.DateTimeField(null=True, blank=True)
+    last_message_id = models.BigIntegerField(null=True, blank=True)
+    # Each side's running count of messages received, and its read
+    # watermark in that sequence (plus the message id it was taken at)
+    user_message_count = models.PositiveIntegerField(default=0)
+    workshop_message_count = models.PositiveIntegerField(default=0)
+    user_read_count = models.PositiveIntegerField(default=0)
+    workshop_read_count = models.PositiveIntegerField(default=0)
+    user_last_read_id = models.BigIntegerField(null=True, blank=True)
+    workshop_last_read_id = models.BigIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-last_timestamp'], name='chatthread_user_recent_idx'),
+            models.Index(fields=['workshop', '-last_timestamp'], name='chatthread_workshop_recent_idx'),
+        ]
+
+    def __str__(self):
+        return self.room_name
+
+    @property
+    def user_unread_count(self):
+        return self.user_message_count - self.user_read_count
+
+    @property
+    def workshop_unread_count(self):
+        return self.workshop_message_count - self.workshop_read_count
+
+    @classmethod
+    def mark_read(cls, room_name, user=None, workshop=None):
+        """Move one side's watermark up to the room's latest message: a single-row write."""
+        if user is not None:
+            return cls.objects.filter(room_name=room_name, user=user).update(
+                user_read_count=F('user_message_count'), user_last_read_id=F('last_message_id')
+            )
+        return cls.objects.filter(room_name=room_name, workshop=workshop).update(
+            workshop_read_count=F('workshop_message_count'), workshop_last_read_id=F('last_message_id')
+        )
+
+    @classmethod
+    def record_messages(cls, messages):
+        """Fold freshly stored messages into their rooms' threads."""
+        rooms = {}
+        for message in messages:
+            rooms.setdefault(message.room_name, []).append(message)
+
+        with transaction.atomic():
+            for room_name, room_messages in rooms.items():
+                first = room_messages[0]
+                thread, _ = cls.objects.select_for_update().get_or_create(
+                    room_name=room_name,
+                    defaults={
+                        'user_id': first.sender_user_id or first.receiver_user_id,
+                        'workshop_id': first.sender_workshop_id or first.receiver_workshop_id,
+                    },
+                )
+
+                updates = {
+                    'user_message_count': F('user_message_count') + sum(1 for m in room_messages if m.receiver_user_id),
+                    'workshop_message_count': F('workshop_message_count') + sum(1 for m in room_messages if m.receiver_workshop_id),
+                    'last_message_id': max(m.id for m in room_messages),
+                }
+                latest = max(room_messages, key=lambda m: m.timestamp)
+                if thread.last_timestamp is None or latest.timestamp >= thread.last_timestamp:
+                    updates['last_message'] = latest.message
+                    updates['last_timestamp'] = latest.timestamp
+
+                cls.objects.filter(pk=thread.pk).update(**updates)
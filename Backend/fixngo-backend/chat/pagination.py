@@ -0,0 +1,134 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class MessageCursorPagination(BasePagination):
+    """
+    Keyset pagination over a room's messages using message ids as cursors.
+
+    - no cursor:      the latest page of the room
+    - `before=<id>`:  the page of messages older than <id>
+    - `after=<id>`:   the page of messages newer than <id>
+    - `since=<id>`:   delta mode for reconnecting clients; everything newer
+                      than <id>, in pages of up to `max_page_size`
+
+    Pages are always returned oldest first, and `previous` / `next` link to
+    the older / newer page when one exists.
+
+    When an `archive` queryset is given, pages continue into it once the hot
+    queryset runs out of older messages. Archived ids are all below the hot
+    ones (see chat.archive), so the two tables form one id-ordered history.
+    """
+    page_size = 50
+    page_size_query_param = 'limit'
+    max_page_size = 200
+    cursor_query_params = ('before', 'after', 'since')
+    invalid_cursor_message = 'Invalid message cursor'
+
+    def __init__(self, archive=None):
+        self.archive = archive
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        cursors = {param: self.get_cursor(request, param) for param in self.cursor_query_params}
+        self.has_next = False
+        self.has_previous = False
+
+        if cursors['since'] is not None:
+            # Catch-up reads take as much as a page may hold
+            self.page_size = self.max_page_size
+            self.direction = 'since'
+            results = self.fetch_newer(queryset, cursors['since'])
+            self.has_next = len(results) > self.page_size
+            self.page = results[:self.page_size]
+            return self.page
+
+        self.page_size = self.get_page_size(request)
+
+        if cursors['after'] is not None:
+            self.direction = 'after'
+            results = self.fetch_newer(queryset, cursors['after'])
+            self.has_next = len(results) > self.page_size
+            self.has_previous = True
+            self.page = results[:self.page_size]
+            return self.page
+
+        self.direction = 'before'
+        self.has_next = cursors['before'] is not None
+        results = self.fetch_older(queryset, cursors['before'])
+        self.has_previous = len(results) > self.page_size
+        self.page = results[:self.page_size][::-1]
+        return self.page
+
+    def fetch_newer(self, queryset, cursor):
+        # Fetch one extra row to know whether a newer page exists. The cursor
+        # row itself is read too: when it is still in the hot table, so is
+        # everything newer, and the archive is skipped. That is the usual
+        # case, a reconnecting client catching up from its last message
+        rows = list(queryset.filter(id__gte=cursor).order_by('id')[:self.page_size + 2])
+        if rows and rows[0].id == cursor:
+            return rows[1:]
+        rows = rows[:self.page_size + 1]
+
+        # The cursor is archived (or gone): archived ids are all below the
+        # hot ones, so archived messages after it come first
+        if self.archive is None:
+            return rows
+        archived = list(self.archive.filter(id__gt=cursor).order_by('id')[:self.page_size + 1])
+        return (archived + rows)[:self.page_size + 1]
+
+    def fetch_older(self, queryset, cursor):
+        # Fetch one extra row to know whether an older page exists; the
+        # archive is only read once the hot table has nothing older left
+        if cursor is not None:
+            queryset = queryset.filter(id__lt=cursor)
+        results = list(queryset.order_by('-id')[:self.page_size + 1])
+        if len(results) <= self.page_size and self.archive is not None:
+            archive = self.archive if cursor is None else self.archive.filter(id__lt=cursor)
+            results += list(archive.order_by('-id')[:self.page_size + 1 - len(results)])
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_cursor(self, request, param):
+        value = request.query_params.get(param)
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValidationError(self.invalid_cursor_message)
+
+    def get_link(self, param, message):
+        url = self.request.build_absolute_uri()
+        for other in self.cursor_query_params:
+            url = remove_query_param(url, other)
+        return replace_query_param(url, param, message.id)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        # Delta syncs keep following `since` until they are caught up
+        param = 'since' if self.direction == 'since' else 'after'
+        return self.get_link(param, self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.get_link('before', self.page[0])
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
@@ -0,0 +1,94 @@
+import logging
+import redis.asyncio as redis
+from django.conf import settings
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+ROOM_KEY = "chat:presence:{room}"
+HEARTBEAT_KEY = "chat:presence:{room}:{member}"
+# Presence is best-effort: a slow Redis must not hold up chat frames
+PRESENCE_REDIS_TIMEOUT = 1  # seconds
+
+
+def presence_member(user=None, workshop=None):
+    """Presence id of a chat participant, e.g. `user:12` or `workshop:3`."""
+    return f"user:{user.id}" if user is not None else f"workshop:{workshop.id}"
+
+
+class PresenceStore:
+    """
+    Who is connected to each chat room, kept in a Redis set per room.
+
+    Every member also owns a heartbeat key that expires after `ttl` seconds
+    unless refreshed, so members whose socket died without a clean
+    disconnect (a crashed worker, a dropped network) fall out of the set the
+    next time it is read. The room set itself expires once nobody refreshes it.
+
+    Redis failures are logged and swallowed, so chat keeps working without
+    presence: `join` then returns None instead of the member list.
+    """
+
+    def __init__(self, url, ttl):
+        self.url = url
+        self.ttl = ttl
+        self.client = None
+
+    def get_client(self):
+        if self.client is None:
+            self.client = redis.Redis.from_url(
+                self.url,
+                decode_responses=True,
+                socket_timeout=PRESENCE_REDIS_TIMEOUT,
+                socket_connect_timeout=PRESENCE_REDIS_TIMEOUT,
+            )
+        return self.client
+
+    async def join(self, room, member):
+        try:
+            await self.refresh(room, member)
+            return await self.members(room)
+        except RedisError as exc:
+            logger.warning("Chat presence unavailable, joining %s without it: %s", room, exc)
+            return None
+
+    async def heartbeat(self, room, member):
+        try:
+            await self.refresh(room, member)
+        except RedisError as exc:
+            logger.warning("Chat presence heartbeat for %s failed: %s", room, exc)
+
+    async def refresh(self, room, member):
+        room_key = ROOM_KEY.format(room=room)
+        async with self.get_client().pipeline(transaction=False) as pipe:
+            pipe.sadd(room_key, member)
+            pipe.expire(room_key, self.ttl)
+            pipe.set(HEARTBEAT_KEY.format(room=room, member=member), 1, ex=self.ttl)
+            await pipe.execute()
+
+    async def leave(self, room, member):
+        # A member missed here drops out once its heartbeat key expires
+        try:
+            async with self.get_client().pipeline(transaction=False) as pipe:
+                pipe.srem(ROOM_KEY.format(room=room), member)
+                pipe.delete(HEARTBEAT_KEY.format(room=room, member=member))
+                await pipe.execute()
+        except RedisError as exc:
+            logger.warning("Chat presence leave for %s failed: %s", room, exc)
+
+    async def members(self, room):
+        client = self.get_client()
+        room_key = ROOM_KEY.format(room=room)
+        members = sorted(await client.smembers(room_key))
+        if not members:
+            return []
+
+        # Prune members whose heartbeat has expired
+        heartbeats = await client.mget([HEARTBEAT_KEY.format(room=room, member=member) for member in members])
+        expired = [member for member, beat in zip(members, heartbeats) if beat is None]
+        if expired:
+            await client.srem(room_key, *expired)
+        return [member for member, beat in zip(members, heartbeats) if beat is not None]
+
+
+presence = PresenceStore(settings.CHAT_PRESENCE_REDIS_URL, settings.CHAT_PRESENCE_TTL)
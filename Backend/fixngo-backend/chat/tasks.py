@@ -0,0 +1,8 @@
+from celery import shared_task
+from .archive import archive_messages
+
+
+@shared_task
+def archive_old_messages():
+    # Scheduled daily through CELERY_BEAT_SCHEDULE
+    return archive_messages()
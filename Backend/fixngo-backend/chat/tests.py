@@ -1,3 +1,99 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from chat.archive import archive_messages
+from chat.models import ArchivedMessage, Message, build_room_name
+from chat.presence import presence
+from chat.routing import websocket_urlpatterns
+from chat.write_buffer import persist_messages
+from users.models import User
+from workshop.models import Workshop
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class ChatWithoutPresenceTests(TransactionTestCase):
+    """Chat keeps working when the presence Redis is unreachable."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('presence', 'presence@example.com', 'pw', phone='9300000000')
+        self.workshop = Workshop.objects.create(
+            name="presence workshop", email="presence-workshop@example.com", phone="9300000001", location="Kochi"
+        )
+
+        # Nothing listens on port 1, so every presence call fails to connect
+        url, client = presence.url, presence.client
+        presence.url, presence.client = "redis://127.0.0.1:1/0", None
+
+        def restore():
+            presence.url, presence.client = url, client
+        self.addCleanup(restore)
+
+    def test_messages_flow_without_presence(self):
+        async def chat():
+            communicator = WebsocketCommunicator(
+                URLRouter(websocket_urlpatterns), f"/ws/chat/{self.user.id}/{self.workshop.id}/"
+            )
+            communicator.scope["user"] = self.user
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+
+            # No presence_state without presence, but our own "online" still goes out
+            self.assertEqual((await communicator.receive_json_from())["type"], "presence_event")
+
+            await communicator.send_json_to({"type": "heartbeat"})
+            await communicator.send_json_to({"message": "still here"})
+            event = await communicator.receive_json_from(timeout=5)
+            self.assertEqual((event["type"], event["message"]), ("chat_message", "still here"))
+            await communicator.disconnect()
+
+        async_to_sync(chat)()
+        self.assertTrue(Message.objects.filter(message="still here").exists())
+
+
+class HistoryCatchUpTests(TestCase):
+    """`since` reads the archive only when the cursor has been archived."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('catchup', 'catchup@example.com', 'pw', phone='9300000002')
+        self.workshop = Workshop.objects.create(
+            name="catchup workshop", email="catchup-workshop@example.com", phone="9300000003", location="Kochi"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        room_name = build_room_name(self.user.id, self.workshop.id)
+        persist_messages([
+            Message(room_name=room_name, message=f"message {i}", sender_user=self.user, receiver_workshop=self.workshop)
+            for i in range(10)
+        ])
+        self.ids = list(Message.objects.order_by('id').values_list('id', flat=True))
+
+        # The oldest four move to the archive
+        Message.objects.filter(id__in=self.ids[:4]).update(timestamp=timezone.now() - timedelta(days=400))
+        archive_messages(older_than_days=30)
+
+    def catch_up(self, since):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/users/chat/history/{self.workshop.id}/', {'since': since})
+        self.assertEqual(response.status_code, 200)
+        archive_table = ArchivedMessage._meta.db_table
+        archive_reads = [query for query in queries if archive_table in query['sql']]
+        return [message['id'] for message in response.json()['results']], archive_reads
+
+    def test_hot_cursor_skips_the_archive(self):
+        ids, archive_reads = self.catch_up(self.ids[5])
+        self.assertEqual(ids, self.ids[6:])
+        self.assertEqual(archive_reads, [])
+
+    def test_archived_cursor_continues_into_the_hot_table(self):
+        ids, archive_reads = self.catch_up(self.ids[1])
+        self.assertEqual(ids, self.ids[2:])
+        self.assertEqual(len(archive_reads), 1)
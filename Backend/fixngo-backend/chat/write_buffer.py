@@ -0,0 +1,98 @@
+import asyncio
+import atexit
+import logging
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import transaction
+from chat.models import Message, ChatThread
+
+logger = logging.getLogger(__name__)
+
+
+def persist_messages(messages, batch_size=None):
+    # Messages and their thread summaries are committed together
+    # bulk_create skips save(), so fill the typed room key here
+    for message in messages:
+        message.fill_room_key()
+    with transaction.atomic():
+        saved = Message.objects.bulk_create(messages, batch_size=batch_size)
+        ChatThread.record_messages(saved)
+    return saved
+
+
+class MessageWriteBuffer:
+    """
+    Coalesces chat messages from every room in this process into periodic
+    bulk_create calls. A batch is written once it reaches max_batch_size or
+    max_latency seconds after its first message, whichever comes first.
+    `save` resolves with the stored Message (including its id) after the
+    batch containing it has been committed.
+    """
+
+    def __init__(self, max_batch_size, max_latency):
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.pending = []
+        self.flusher = None
+        self.batch_full = None
+        self.flush_lock = None
+
+    async def save(self, **fields):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((Message(**fields), future))
+        self.ensure_flusher()
+        if len(self.pending) >= self.max_batch_size:
+            self.batch_full.set()
+        return await future
+
+    def ensure_flusher(self):
+        if self.flusher is None or self.flusher.done():
+            self.batch_full = asyncio.Event()
+            if self.flush_lock is None or not self.flush_lock.locked():
+                self.flush_lock = asyncio.Lock()
+            self.flusher = asyncio.ensure_future(self.run())
+
+    async def run(self):
+        # Runs while messages are pending, restarted by the next save
+        while self.pending:
+            try:
+                await asyncio.wait_for(self.batch_full.wait(), timeout=self.max_latency)
+            except asyncio.TimeoutError:
+                pass
+            self.batch_full.clear()
+            await self.flush()
+
+    async def flush(self):
+        if self.flush_lock is None:
+            return
+        async with self.flush_lock:
+            while self.pending:
+                batch = self.pending[:self.max_batch_size]
+                self.pending = self.pending[self.max_batch_size:]
+                try:
+                    saved = await database_sync_to_async(persist_messages)(
+                        [message for message, _ in batch]
+                    )
+                except Exception as e:
+                    logger.exception("Failed to persist %d chat messages", len(batch))
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                for message, (_, future) in zip(saved, batch):
+                    if not future.done():
+                        future.set_result(message)
+
+    def flush_sync(self):
+        """Write anything still buffered; used at interpreter shutdown."""
+        batch, self.pending = self.pending, []
+        if batch:
+            persist_messages([message for message, _ in batch], batch_size=self.max_batch_size)
+
+
+message_buffer = MessageWriteBuffer(
+    max_batch_size=settings.CHAT_MESSAGE_BATCH_SIZE,
+    max_latency=settings.CHAT_MESSAGE_FLUSH_INTERVAL,
+)
+atexit.register(message_buffer.flush_sync)
@@ -11,6 +11,7 @@ import os
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from chat.routing import websocket_urlpatterns
+from notifications.routing import websocket_urlpatterns as notification_urlpatterns
 from chat.middleware import JWTAuthMiddleware  # Import our middleware
 from channels.auth import AuthMiddlewareStack
 
@@ -20,7 +21,7 @@ application = ProtocolTypeRouter({
     "http": get_asgi_application(),
     "websocket": JWTAuthMiddleware(
         AuthMiddlewareStack(
-            URLRouter(websocket_urlpatterns)
+            URLRouter(websocket_urlpatterns + notification_urlpatterns)
         )
     ),
 })
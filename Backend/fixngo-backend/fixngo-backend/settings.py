@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 from pathlib import Path
 from decouple import config, Csv
 from datetime import timedelta
+from celery.schedules import crontab
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -51,6 +52,8 @@ INSTALLED_APPS = [
     'admin_side',
     'workshop',
     'service',
+    'notifications',
+    'metrics',
 ]
 
 REST_FRAMEWORK = {
@@ -92,6 +95,10 @@ AWS_MEDIA_LOCATION = config('AWS_MEDIA_LOCATION')
 AWS_STATIC_LOCATION = config('AWS_STATIC_LOCATION')
 AWS_QUERYSTRING_AUTH = config('AWS_QUERYSTRING_AUTH')
 
+# Presigned URL cache (local LRU size and optional shared Redis tier)
+PRESIGNED_URL_CACHE_SIZE = config('PRESIGNED_URL_CACHE_SIZE', default=2048, cast=int)
+PRESIGNED_URL_REDIS_URL = config('PRESIGNED_URL_REDIS_URL', default='')
+
 # Media storage configuration
 DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
 
@@ -104,6 +111,36 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
+CELERY_BEAT_SCHEDULE = {
+    'archive-old-chat-messages': {
+        'task': 'chat.tasks.archive_old_messages',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    # Sweeps notifications whose first delivery attempt failed
+    'deliver-pending-notifications': {
+        'task': 'notifications.tasks.deliver_notifications',
+        'schedule': 30.0,
+    },
+    'refresh-daily-metrics': {
+        'task': 'metrics.tasks.refresh_daily_metrics',
+        'schedule': crontab(hour=2, minute=30),
+    },
+    # Re-enqueues workshops whose geocoding job never ran
+    'requeue-pending-geocoding': {
+        'task': 'workshop.tasks.requeue_pending_geocoding',
+        'schedule': crontab(minute='*/15'),
+    },
+}
+
+# Geocoding backend (use workshop.geocoders.FixtureGeocoder for tests)
+GEOCODER_BACKEND = config('GEOCODER_BACKEND', default='workshop.geocoders.NominatimGeocoder')
+GEOCODER_TIMEOUT = config('GEOCODER_TIMEOUT', default=10, cast=int)
+GEOCODER_FIXTURES = {}
+GEOCODE_CACHE_TTL = config('GEOCODE_CACHE_TTL', default=60 * 60 * 24 * 30, cast=int)  # seconds
+GEOCODE_CACHE_SIZE = config('GEOCODE_CACHE_SIZE', default=1024, cast=int)
+# Pending workshops older than this are re-enqueued; longer than a job's full retry schedule
+GEOCODE_REQUEUE_AFTER = config('GEOCODE_REQUEUE_AFTER', default=60 * 60, cast=int)  # seconds
+GEOCODE_REQUEUE_BATCH_SIZE = config('GEOCODE_REQUEUE_BATCH_SIZE', default=500, cast=int)
 
 # Optional: Store task results in the database
 INSTALLED_APPS += ['django_celery_results']
@@ -118,6 +155,43 @@ CHANNEL_LAYERS = {
     },
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': config('CACHE_REDIS_URL', default='redis://127.0.0.1:6379/2'),
+    }
+}
+
+# Seconds an authenticated User/Workshop stays cached for JWT requests
+PRINCIPAL_CACHE_TTL = config('PRINCIPAL_CACHE_TTL', default=300, cast=int)
+
+# Chat message write buffer: flush after this many messages or seconds
+CHAT_MESSAGE_BATCH_SIZE = config('CHAT_MESSAGE_BATCH_SIZE', default=200, cast=int)
+CHAT_MESSAGE_FLUSH_INTERVAL = config('CHAT_MESSAGE_FLUSH_INTERVAL', default=0.05, cast=float)
+
+# Chat presence: heartbeats expire after CHAT_PRESENCE_TTL seconds, and a
+# connection re-broadcasts "typing" at most once per CHAT_TYPING_THROTTLE seconds
+CHAT_PRESENCE_REDIS_URL = config('CHAT_PRESENCE_REDIS_URL', default='redis://127.0.0.1:6379/3')
+CHAT_PRESENCE_TTL = config('CHAT_PRESENCE_TTL', default=60, cast=int)
+CHAT_TYPING_THROTTLE = config('CHAT_TYPING_THROTTLE', default=2.0, cast=float)
+
+# Notification outbox delivery: rows per batch, and attempts before giving up
+NOTIFICATION_BATCH_SIZE = config('NOTIFICATION_BATCH_SIZE', default=100, cast=int)
+NOTIFICATION_MAX_ATTEMPTS = config('NOTIFICATION_MAX_ATTEMPTS', default=6, cast=int)
+# Per-push timeout (seconds), and the circuit breaker that stops pushes after
+# NOTIFICATION_BREAKER_THRESHOLD consecutive failures for NOTIFICATION_BREAKER_RESET seconds
+NOTIFICATION_PUSH_TIMEOUT = config('NOTIFICATION_PUSH_TIMEOUT', default=2.0, cast=float)
+NOTIFICATION_BREAKER_THRESHOLD = config('NOTIFICATION_BREAKER_THRESHOLD', default=5, cast=int)
+NOTIFICATION_BREAKER_RESET = config('NOTIFICATION_BREAKER_RESET', default=30, cast=int)
+
+# Chat messages older than this many days move to the archive table
+CHAT_ARCHIVE_AFTER_DAYS = config('CHAT_ARCHIVE_AFTER_DAYS', default=180, cast=int)
+CHAT_ARCHIVE_BATCH_SIZE = config('CHAT_ARCHIVE_BATCH_SIZE', default=5000, cast=int)
+
+# Trailing days of dashboard metrics re-derived from source rows every night
+METRICS_REFRESH_DAYS = config('METRICS_REFRESH_DAYS', default=7, cast=int)
+# Longest a cached dashboard payload is served, even without an invalidating write (seconds)
+DASHBOARD_CACHE_MAX_STALENESS = config('DASHBOARD_CACHE_MAX_STALENESS', default=60, cast=int)
 
 ASGI_APPLICATION = "fixngo-backend.asgi.application"
 
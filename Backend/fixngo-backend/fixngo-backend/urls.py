@@ -29,6 +29,7 @@ urlpatterns = [
     path('api/admin_side/', include('admin_side.urls')),
     path('api/workshop/', include('workshop.urls')),
     path('api/service/', include('service.urls')),
+    path('api/notifications/', include('notifications.urls')),
     # path('api/chat/', include('chat.urls')),
     
     # JWT Token Endpoints
@@ -0,0 +1,78 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+
+ADMIN_SCOPE = 'admin'
+
+# How long one process may hold the rebuild lock, and how often waiting
+# processes look for its result
+DASHBOARD_REBUILD_LOCK_TIMEOUT = 10  # seconds
+DASHBOARD_REBUILD_POLL_INTERVAL = 0.05  # seconds
+
+
+def workshop_scope(workshop_id):
+    return f"workshop:{workshop_id}"
+
+
+def dashboard_cache_key(scope, name):
+    return f"dashboard:{scope}:{name}"
+
+
+def generation_cache_key(scope):
+    return f"dashboard:{scope}:generation"
+
+
+def cached_dashboard(scope, name, build):
+    """
+    Return the payload `build()` produces for dashboard `name` in `scope`
+    (ADMIN_SCOPE or a workshop_scope), served from the shared cache.
+
+    Writes to the tables behind a scope bump its generation (see
+    metrics.signals), which retires every cached payload in it. Only one
+    process rebuilds a retired payload at a time; the others keep serving
+    the previous one, or wait for the rebuild when there is none. Nothing
+    older than DASHBOARD_CACHE_MAX_STALENESS seconds is ever served, which
+    also bounds how long writes that skip signals stay invisible.
+    """
+    key = dashboard_cache_key(scope, name)
+    generation_key = generation_cache_key(scope)
+    cached = cache.get_many([key, generation_key])
+    entry = cached.get(key)
+    generation = cached.get(generation_key)
+    max_staleness = settings.DASHBOARD_CACHE_MAX_STALENESS
+
+    def fresh_enough(entry):
+        return entry is not None and time.time() - entry['built_at'] < max_staleness
+
+    if fresh_enough(entry) and entry['generation'] == generation:
+        return entry['payload']
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, DASHBOARD_REBUILD_LOCK_TIMEOUT):
+        try:
+            # Stamped with the generation read before building, so a write
+            # landing mid-build retires this payload straight away
+            entry = {'payload': build(), 'generation': generation, 'built_at': time.time()}
+            cache.set(key, entry, max_staleness)
+            return entry['payload']
+        finally:
+            cache.delete(lock_key)
+
+    # Another process is rebuilding: the previous payload is good enough
+    if fresh_enough(entry):
+        return entry['payload']
+
+    # Nothing servable yet, so wait for the rebuild (an entry that was too
+    # old above cannot pass fresh_enough() until it has been replaced)
+    deadline = time.time() + DASHBOARD_REBUILD_LOCK_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(DASHBOARD_REBUILD_POLL_INTERVAL)
+        rebuilt = cache.get(key)
+        if fresh_enough(rebuilt):
+            return rebuilt['payload']
+    return build()
+
+
+def invalidate_dashboards(*scopes):
+    # A fresh value rather than incr(), which fails once the key is evicted
+    cache.set_many({generation_cache_key(scope): time.time_ns() for scope in scopes}, None)
@@ -0,0 +1,26 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from metrics.rollup import rebuild_daily_metrics
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DailyMetrics rollup from ServiceRequest, Payment and User rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Only rebuild the last N days (default: all history)")
+        parser.add_argument('--since', help="Only rebuild from this date on (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        start = None
+        if options['since']:
+            try:
+                start = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError("--since must be a date in YYYY-MM-DD format")
+        elif options['days'] is not None:
+            start = timezone.localdate() - timedelta(days=options['days'])
+
+        written = rebuild_daily_metrics(start)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} daily metrics rows"))
@@ -0,0 +1,44 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from metrics.rollup import find_drift, rebuild_daily_metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute DailyMetrics counters from ServiceRequest, Payment and User rows "
+        "and report where the stored counters drifted"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Only check the last N days (default: all history)")
+        parser.add_argument('--since', help="Only check from this date on (YYYY-MM-DD)")
+        parser.add_argument('--fix', action='store_true', help="Rebuild the drifted days from the source tables")
+
+    def handle(self, *args, **options):
+        start = None
+        if options['since']:
+            try:
+                start = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError("--since must be a date in YYYY-MM-DD format")
+        elif options['days'] is not None:
+            start = timezone.localdate() - timedelta(days=options['days'])
+
+        drift = find_drift(start)
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("No drift found"))
+            return
+
+        for day, workshop_id, field, stored, expected in drift:
+            scope = f"workshop {workshop_id}" if workshop_id is not None else "platform"
+            self.stdout.write(f"{day} {scope} {field}: stored {stored}, expected {expected}")
+
+        days = sorted({day for day, *_ in drift})
+        self.stdout.write(self.style.WARNING(f"{len(drift)} counters drifted across {len(days)} days"))
+
+        if options['fix']:
+            for day in days:
+                rebuild_daily_metrics(day, day)
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(days)} days"))
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('workshop', '0029_geocodecache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('requests', models.IntegerField(default=0)),
+                ('requests_pending', models.IntegerField(default=0)),
+                ('requests_accepted', models.IntegerField(default=0)),
+                ('requests_rejected', models.IntegerField(default=0)),
+                ('requests_in_progress', models.IntegerField(default=0)),
+                ('requests_completed', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('platform_fee', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('workshop_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('pending_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('pending_platform_fee', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('pending_workshop_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('failed_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('failed_platform_fee', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('failed_workshop_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('signups', models.IntegerField(default=0)),
+                ('active_signups', models.IntegerField(default=0)),
+                ('workshop', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_metrics', to='workshop.workshop')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('workshop__isnull', False)), fields=('workshop', 'date'), name='dailymetrics_workshop_day_uniq'), models.UniqueConstraint(condition=models.Q(('workshop__isnull', True)), fields=('date',), name='dailymetrics_platform_day_uniq')],
+            },
+        ),
+    ]
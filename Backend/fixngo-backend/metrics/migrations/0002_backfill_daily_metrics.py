@@ -0,0 +1,93 @@
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+# Frozen copies of the status maps in metrics.models, so later changes to
+# the app code cannot alter what this migration does
+REQUEST_STATUS_FIELDS = {
+    'PENDING': 'requests_pending',
+    'ACCEPTED': 'requests_accepted',
+    'REJECTED': 'requests_rejected',
+    'IN_PROGRESS': 'requests_in_progress',
+    'COMPLETED': 'requests_completed',
+}
+
+PAYMENT_STATUS_FIELDS = {
+    'SUCCESS': ('revenue', 'platform_fee', 'workshop_amount'),
+    'PENDING': ('pending_revenue', 'pending_platform_fee', 'pending_workshop_amount'),
+    'FAILED': ('failed_revenue', 'failed_platform_fee', 'failed_workshop_amount'),
+}
+
+
+def backfill_daily_metrics(apps, schema_editor):
+    """
+    Build DailyMetrics for all existing history, so the dashboards start
+    from real totals and the signal handlers' deltas land on top of them.
+    Mirrors metrics.rollup.compute_daily_metrics.
+    """
+    DailyMetrics = apps.get_model('metrics', 'DailyMetrics')
+    ServiceRequest = apps.get_model('users', 'ServiceRequest')
+    Payment = apps.get_model('users', 'Payment')
+    User = apps.get_model('users', 'User')
+
+    rows = defaultdict(lambda: defaultdict(int))
+
+    requests = ServiceRequest.objects.annotate(day=TruncDate('created_at')).values('day', 'workshop_id').annotate(
+        requests=Count('id'),
+        **{
+            field: Count('id', filter=Q(status=status_code))
+            for status_code, field in REQUEST_STATUS_FIELDS.items()
+        }
+    )
+    payments = Payment.objects.annotate(day=TruncDate('created_at')).values('day', 'service_request__workshop_id').annotate(
+        **{
+            f'{field}_total': Sum(source, filter=Q(status=status_code))
+            for status_code, fields in PAYMENT_STATUS_FIELDS.items()
+            for field, source in zip(fields, ('amount', 'platform_fee', 'workshop_amount'))
+        }
+    )
+    signups = User.objects.annotate(day=TruncDate('created_at')).values('day').annotate(
+        signups=Count('id'),
+        active_signups=Count('id', filter=Q(is_active=True)),
+    )
+
+    # Workshop rows roll up into the platform row (workshop None) of their day
+    for entry in requests:
+        for workshop_id in (entry['workshop_id'], None):
+            row = rows[(entry['day'], workshop_id)]
+            for field, value in entry.items():
+                if field not in ('day', 'workshop_id'):
+                    row[field] += value
+
+    for entry in payments:
+        for workshop_id in (entry['service_request__workshop_id'], None):
+            row = rows[(entry['day'], workshop_id)]
+            for fields in PAYMENT_STATUS_FIELDS.values():
+                for field in fields:
+                    row[field] += entry[f'{field}_total'] or 0
+
+    for entry in signups:
+        row = rows[(entry['day'], None)]
+        row['signups'] += entry['signups']
+        row['active_signups'] += entry['active_signups']
+
+    DailyMetrics.objects.all().delete()
+    DailyMetrics.objects.bulk_create([
+        DailyMetrics(date=day, workshop_id=workshop_id, **values)
+        for (day, workshop_id), values in rows.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('metrics', '0001_initial'),
+        ('users', '0026_alter_otp_email'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_daily_metrics, migrations.RunPython.noop),
+    ]
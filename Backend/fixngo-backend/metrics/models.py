@@ -0,0 +1,94 @@
+from django.db import models, transaction
+from django.db.models import F, Q
+from workshop.models import Workshop
+
+# ServiceRequest status -> per-status request counter
+REQUEST_STATUS_FIELDS = {
+    'PENDING': 'requests_pending',
+    'ACCEPTED': 'requests_accepted',
+    'REJECTED': 'requests_rejected',
+    'IN_PROGRESS': 'requests_in_progress',
+    'COMPLETED': 'requests_completed',
+}
+
+# Payment status -> (amount, platform fee, workshop amount) totals
+PAYMENT_STATUS_FIELDS = {
+    'SUCCESS': ('revenue', 'platform_fee', 'workshop_amount'),
+    'PENDING': ('pending_revenue', 'pending_platform_fee', 'pending_workshop_amount'),
+    'FAILED': ('failed_revenue', 'failed_platform_fee', 'failed_workshop_amount'),
+}
+
+
+def money_field():
+    return models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+
+class DailyMetrics(models.Model):
+    """
+    One day of dashboard figures, for a single workshop or, with no
+    workshop, for the whole platform.
+
+    Requests and payments are counted on the day they were created, under
+    their current status, so a status change moves them between columns of
+    the same row. Rows are kept current by `metrics.signals` and rebuilt from
+    the source tables by `metrics.rollup.rebuild_daily_metrics`.
+    """
+    date = models.DateField()
+    workshop = models.ForeignKey(
+        Workshop, on_delete=models.CASCADE, null=True, blank=True, related_name="daily_metrics"
+    )
+
+    requests = models.IntegerField(default=0)
+    requests_pending = models.IntegerField(default=0)
+    requests_accepted = models.IntegerField(default=0)
+    requests_rejected = models.IntegerField(default=0)
+    requests_in_progress = models.IntegerField(default=0)
+    requests_completed = models.IntegerField(default=0)
+
+    revenue = money_field()
+    platform_fee = money_field()
+    workshop_amount = money_field()
+    pending_revenue = money_field()
+    pending_platform_fee = money_field()
+    pending_workshop_amount = money_field()
+    failed_revenue = money_field()
+    failed_platform_fee = money_field()
+    failed_workshop_amount = money_field()
+
+    # Platform rows only
+    signups = models.IntegerField(default=0)
+    active_signups = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['workshop', 'date'], condition=Q(workshop__isnull=False),
+                name='dailymetrics_workshop_day_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['date'], condition=Q(workshop__isnull=True),
+                name='dailymetrics_platform_day_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.workshop or 'platform'} {self.date}"
+
+    @classmethod
+    def record(cls, date, workshop_id=None, create=True, **deltas):
+        """
+        Add `deltas` to a workshop's row for `date` and to the platform row.
+        With `create=False` missing rows are left alone, so removals never
+        recreate rows for a workshop that is being deleted.
+        """
+        increments = {field: F(field) + value for field, value in deltas.items() if value}
+        if not increments:
+            return
+
+        targets = [None] if workshop_id is None else [workshop_id, None]
+        with transaction.atomic():
+            for target in targets:
+                updated = cls.objects.filter(date=date, workshop_id=target).update(**increments)
+                if not updated and create:
+                    row, _ = cls.objects.get_or_create(date=date, workshop_id=target)
+                    cls.objects.filter(pk=row.pk).update(**increments)
@@ -0,0 +1,149 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from users.models import User, ServiceRequest, Payment
+from .models import DailyMetrics, REQUEST_STATUS_FIELDS, PAYMENT_STATUS_FIELDS
+
+
+def request_deltas(status, sign=1):
+    deltas = {'requests': sign}
+    if status in REQUEST_STATUS_FIELDS:
+        deltas[REQUEST_STATUS_FIELDS[status]] = sign
+    return deltas
+
+
+def payment_deltas(status, amount, platform_fee, workshop_amount, sign=1):
+    if status not in PAYMENT_STATUS_FIELDS:
+        return {}
+    values = (amount, platform_fee, workshop_amount)
+    return {
+        field: sign * Decimal(str(value or 0))
+        for field, value in zip(PAYMENT_STATUS_FIELDS[status], values)
+    }
+
+
+def signup_deltas(is_active, sign=1):
+    return {'signups': sign, 'active_signups': sign if is_active else 0}
+
+
+def date_range_filter(prefix, start, end):
+    filters = {}
+    if start is not None:
+        filters[f'{prefix}__date__gte'] = start
+    if end is not None:
+        filters[f'{prefix}__date__lte'] = end
+    return filters
+
+
+def compute_daily_metrics(start=None, end=None):
+    """
+    Derive DailyMetrics values for the days between `start` and `end`
+    (inclusive, either may be None for an open end) from the source tables,
+    as {(date, workshop_id): {field: value}} with None for platform rows.
+    """
+    rows = defaultdict(lambda: defaultdict(int))
+
+    requests = ServiceRequest.objects.filter(
+        **date_range_filter('created_at', start, end)
+    ).annotate(day=TruncDate('created_at')).values('day', 'workshop_id').annotate(
+        requests=Count('id'),
+        **{
+            field: Count('id', filter=Q(status=status_code))
+            for status_code, field in REQUEST_STATUS_FIELDS.items()
+        }
+    )
+
+    payments = Payment.objects.filter(
+        **date_range_filter('created_at', start, end)
+    ).annotate(day=TruncDate('created_at')).values('day', 'service_request__workshop_id').annotate(
+        # Suffixed so the sums do not shadow Payment's own columns
+        **{
+            f'{field}_total': Sum(source, filter=Q(status=status_code))
+            for status_code, fields in PAYMENT_STATUS_FIELDS.items()
+            for field, source in zip(fields, ('amount', 'platform_fee', 'workshop_amount'))
+        }
+    )
+
+    signups = User.objects.filter(
+        **date_range_filter('created_at', start, end)
+    ).annotate(day=TruncDate('created_at')).values('day').annotate(
+        signups=Count('id'),
+        active_signups=Count('id', filter=Q(is_active=True)),
+    )
+
+    # Workshop rows roll up into the platform row (workshop None) of their day
+    for entry in requests:
+        for workshop_id in (entry['workshop_id'], None):
+            row = rows[(entry['day'], workshop_id)]
+            for field, value in entry.items():
+                if field not in ('day', 'workshop_id'):
+                    row[field] += value
+
+    for entry in payments:
+        for workshop_id in (entry['service_request__workshop_id'], None):
+            row = rows[(entry['day'], workshop_id)]
+            for fields in PAYMENT_STATUS_FIELDS.values():
+                for field in fields:
+                    row[field] += entry[f'{field}_total'] or 0
+
+    for entry in signups:
+        row = rows[(entry['day'], None)]
+        row['signups'] += entry['signups']
+        row['active_signups'] += entry['active_signups']
+
+    return rows
+
+
+def metric_fields():
+    return [field.name for field in DailyMetrics._meta.concrete_fields if field.name not in ('id', 'date', 'workshop')]
+
+
+def find_drift(start=None, end=None):
+    """
+    Compare stored DailyMetrics with values derived from the source tables.
+    Returns (date, workshop_id, field, stored, expected) for every mismatch.
+    """
+    expected = compute_daily_metrics(start, end)
+    fields = metric_fields()
+    stored = {
+        (row['date'], row['workshop_id']): row
+        for row in stored_daily_metrics(start, end).values('date', 'workshop_id', *fields)
+    }
+
+    drift = []
+    for key in sorted(set(expected) | set(stored), key=lambda key: (key[0], key[1] or 0)):
+        for field in fields:
+            stored_value = stored.get(key, {}).get(field, 0)
+            expected_value = expected.get(key, {}).get(field, 0)
+            if stored_value != expected_value:
+                drift.append((key[0], key[1], field, stored_value, expected_value))
+    return drift
+
+
+def stored_daily_metrics(start=None, end=None):
+    rows = DailyMetrics.objects.all()
+    if start is not None:
+        rows = rows.filter(date__gte=start)
+    if end is not None:
+        rows = rows.filter(date__lte=end)
+    return rows
+
+
+def rebuild_daily_metrics(start=None, end=None):
+    """
+    Recompute DailyMetrics for the days between `start` and `end` from the
+    source tables, replacing the rows already there. Returns the number of
+    rows written.
+    """
+    rows = compute_daily_metrics(start, end)
+    stale = stored_daily_metrics(start, end)
+
+    with transaction.atomic():
+        stale.delete()
+        DailyMetrics.objects.bulk_create([
+            DailyMetrics(date=day, workshop_id=workshop_id, **values)
+            for (day, workshop_id), values in rows.items()
+        ], batch_size=1000)
+    return len(rows)
@@ -0,0 +1,175 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from users.models import User, ServiceRequest, Payment, Review
+from workshop.models import Workshop
+from .cache import ADMIN_SCOPE, workshop_scope, invalidate_dashboards
+from .models import DailyMetrics
+from .rollup import request_deltas, payment_deltas, signup_deltas
+
+
+def record_change(before, after):
+    """
+    Move a row's contribution from `before` to `after`; each is a
+    (date, workshop_id, deltas) tuple, or None when the row did not exist.
+    """
+    changes = {}
+    for entry, sign in ((before, -1), (after, 1)):
+        if entry is None:
+            continue
+        date, workshop_id, deltas = entry
+        totals = changes.setdefault((date, workshop_id), {})
+        for field, value in deltas.items():
+            totals[field] = totals.get(field, 0) + sign * value
+
+    for (date, workshop_id), deltas in changes.items():
+        DailyMetrics.record(date, workshop_id, create=after is not None, **deltas)
+
+
+def tracks(raw, update_fields, fields):
+    # Fixture loads are left to the backfill command, and saves limited to
+    # other columns (e.g. last_login) cannot move a row
+    return not raw and (update_fields is None or not set(update_fields).isdisjoint(fields))
+
+
+REQUEST_FIELDS = ('status', 'workshop', 'created_at')
+PAYMENT_FIELDS = ('status', 'amount', 'platform_fee', 'workshop_amount', 'service_request', 'created_at')
+USER_FIELDS = ('is_active', 'created_at')
+
+
+# The previous state is read in pre_save so post_save can tell what changed
+
+@receiver(pre_save, sender=ServiceRequest)
+def remember_request(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._metrics_before = None
+    if instance.pk and tracks(raw, update_fields, REQUEST_FIELDS):
+        previous = sender.objects.filter(pk=instance.pk).values('status', 'workshop_id', 'created_at').first()
+        if previous:
+            instance._metrics_before = (
+                timezone.localdate(previous['created_at']),
+                previous['workshop_id'],
+                request_deltas(previous['status']),
+            )
+
+
+@receiver(post_save, sender=ServiceRequest)
+def record_request(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not tracks(raw, update_fields, REQUEST_FIELDS):
+        return
+    record_change(
+        getattr(instance, '_metrics_before', None),
+        (timezone.localdate(instance.created_at), instance.workshop_id, request_deltas(instance.status)),
+    )
+
+
+@receiver(post_delete, sender=ServiceRequest)
+def forget_request(sender, instance, **kwargs):
+    record_change(
+        (timezone.localdate(instance.created_at), instance.workshop_id, request_deltas(instance.status)),
+        None,
+    )
+
+
+@receiver(pre_save, sender=Payment)
+def remember_payment(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._metrics_before = None
+    if instance.pk and tracks(raw, update_fields, PAYMENT_FIELDS):
+        previous = sender.objects.filter(pk=instance.pk).values(
+            'status', 'amount', 'platform_fee', 'workshop_amount', 'created_at', 'service_request__workshop_id'
+        ).first()
+        if previous:
+            instance._metrics_before = (
+                timezone.localdate(previous['created_at']),
+                previous['service_request__workshop_id'],
+                payment_deltas(
+                    previous['status'], previous['amount'], previous['platform_fee'], previous['workshop_amount']
+                ),
+            )
+
+
+def payment_entry(payment):
+    return (
+        timezone.localdate(payment.created_at),
+        payment.service_request.workshop_id,
+        payment_deltas(payment.status, payment.amount, payment.platform_fee, payment.workshop_amount),
+    )
+
+
+@receiver(post_save, sender=Payment)
+def record_payment(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not tracks(raw, update_fields, PAYMENT_FIELDS):
+        return
+    record_change(getattr(instance, '_metrics_before', None), payment_entry(instance))
+
+
+@receiver(post_delete, sender=Payment)
+def forget_payment(sender, instance, **kwargs):
+    record_change(payment_entry(instance), None)
+
+
+@receiver(pre_save, sender=User)
+def remember_signup(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._metrics_before = None
+    if instance.pk and tracks(raw, update_fields, USER_FIELDS):
+        previous = sender.objects.filter(pk=instance.pk).values('is_active', 'created_at').first()
+        if previous:
+            instance._metrics_before = (
+                timezone.localdate(previous['created_at']), None, signup_deltas(previous['is_active'])
+            )
+
+
+@receiver(post_save, sender=User)
+def record_signup(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not tracks(raw, update_fields, USER_FIELDS):
+        return
+    record_change(
+        getattr(instance, '_metrics_before', None),
+        (timezone.localdate(instance.created_at), None, signup_deltas(instance.is_active)),
+    )
+
+
+@receiver(post_delete, sender=User)
+def forget_signup(sender, instance, **kwargs):
+    record_change((timezone.localdate(instance.created_at), None, signup_deltas(instance.is_active)), None)
+
+
+# Cached dashboards are retired once the write commits, so a rebuild can
+# never read the data from before it
+
+def invalidate_on_commit(*scopes):
+    transaction.on_commit(lambda: invalidate_dashboards(*scopes), robust=True)
+
+
+@receiver([post_save, post_delete], sender=ServiceRequest)
+def retire_request_dashboards(sender, instance, **kwargs):
+    invalidate_on_commit(ADMIN_SCOPE, workshop_scope(instance.workshop_id))
+
+
+@receiver([post_save, post_delete], sender=Payment)
+def retire_payment_dashboards(sender, instance, **kwargs):
+    invalidate_on_commit(ADMIN_SCOPE, workshop_scope(instance.service_request.workshop_id))
+
+
+@receiver([post_save, post_delete], sender=Review)
+def retire_review_dashboards(sender, instance, **kwargs):
+    invalidate_on_commit(workshop_scope(instance.workshop_id))
+
+
+def login_only(update_fields):
+    # Logins only touch last_login, which no dashboard shows
+    return update_fields is not None and set(update_fields) <= {'last_login'}
+
+
+@receiver([post_save, post_delete], sender=User)
+def retire_user_dashboards(sender, instance, update_fields=None, **kwargs):
+    if not login_only(update_fields):
+        invalidate_on_commit(ADMIN_SCOPE)
+
+
+@receiver([post_save, post_delete], sender=Workshop)
+def retire_workshop_dashboards(sender, instance, update_fields=None, **kwargs):
+    # The admin dashboard counts active, new and pending workshops; workshops
+    # are auth users too, so their logins save last_login alone
+    if not login_only(update_fields):
+        invalidate_on_commit(ADMIN_SCOPE)
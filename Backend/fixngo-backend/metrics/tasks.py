@@ -0,0 +1,14 @@
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from .rollup import rebuild_daily_metrics
+
+
+@shared_task
+def refresh_daily_metrics():
+    # Scheduled daily through CELERY_BEAT_SCHEDULE. Signals keep the rollup
+    # current; this re-derives the trailing days in case a write skipped
+    # them (queryset.update(), bulk_create, raw SQL)
+    today = timezone.localdate()
+    return rebuild_daily_metrics(today - timedelta(days=settings.METRICS_REFRESH_DAYS), today)
@@ -0,0 +1,32 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from metrics.cache import ADMIN_SCOPE, generation_cache_key
+from users.models import User
+from workshop.models import Workshop
+
+
+class DashboardInvalidationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('login', 'login@example.com', 'pw', phone='9100000000')
+        self.workshop = Workshop.objects.create(
+            name="login workshop", email="login-workshop@example.com", phone="9100000001", location="Kochi"
+        )
+        cache.clear()
+
+    def admin_generation_after(self, save):
+        with self.captureOnCommitCallbacks(execute=True):
+            save()
+        return cache.get(generation_cache_key(ADMIN_SCOPE))
+
+    def test_logins_keep_the_admin_dashboard(self):
+        for account in (self.user, self.workshop):
+            account.last_login = timezone.now()
+            self.assertIsNone(self.admin_generation_after(lambda: account.save(update_fields=['last_login'])))
+
+    def test_other_saves_retire_the_admin_dashboard(self):
+        self.workshop.approval_status = 'approved'
+        self.assertIsNotNone(
+            self.admin_generation_after(lambda: self.workshop.save(update_fields=['approval_status']))
+        )
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from .utils import notification_group
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and refuses calls
+    for `reset_timeout` seconds. After that one trial call is let through
+    (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self.lock:
+            return self.state != 'open'
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == 'half-open' or (self.opened_at is None and self.failures >= self.failure_threshold):
+                logger.warning("Notification circuit opened after %d failures", self.failures)
+                self.opened_at = time.monotonic()
+
+
+class NotificationClient:
+    """
+    Outbound path for notification pushes. A batch is sent from a single
+    event loop, so channels_redis reuses its pooled connections instead of
+    reconnecting per message; each send is bounded by `timeout`, and a
+    circuit breaker stops a dead channel layer from eating worker time.
+    """
+
+    def __init__(self, timeout, breaker):
+        self.timeout = timeout
+        self.breaker = breaker
+        self.metrics = Counter()
+        self.latency_total = 0.0
+
+    def push_many(self, items):
+        """
+        Send `(user_id, payload)` pairs. Returns one result per item: True
+        when sent, False when the send failed, and None when it was skipped
+        because the circuit is open (the caller should retry it later
+        without counting an attempt).
+        """
+        if not self.breaker.allow():
+            self.metrics['short_circuited'] += len(items)
+            return [None] * len(items)
+        return async_to_sync(self._push_many)(items)
+
+    async def _push_many(self, items):
+        channel_layer = get_channel_layer()
+        results = []
+        for user_id, payload in items:
+            if not self.breaker.allow():
+                self.metrics['short_circuited'] += 1
+                results.append(None)
+                continue
+
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(
+                    channel_layer.group_send(
+                        notification_group(user_id),
+                        {"type": "notification", "payload": payload},
+                    ),
+                    timeout=self.timeout,
+                )
+            except asyncio.TimeoutError:
+                self.metrics['timeouts'] += 1
+                self.breaker.record_failure()
+                results.append(False)
+            except Exception:
+                logger.exception("Failed to push notification to user %s", user_id)
+                self.metrics['failed'] += 1
+                self.breaker.record_failure()
+                results.append(False)
+            else:
+                self.metrics['sent'] += 1
+                self.breaker.record_success()
+                results.append(True)
+            finally:
+                self.latency_total += time.perf_counter() - start
+        return results
+
+    def stats(self):
+        attempted = self.metrics['sent'] + self.metrics['failed'] + self.metrics['timeouts']
+        return {
+            **self.metrics,
+            'circuit': self.breaker.state,
+            'avg_latency_ms': round(self.latency_total / attempted * 1000, 2) if attempted else None,
+        }
+
+
+notification_client = NotificationClient(
+    timeout=settings.NOTIFICATION_PUSH_TIMEOUT,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.NOTIFICATION_BREAKER_THRESHOLD,
+        reset_timeout=settings.NOTIFICATION_BREAKER_RESET,
+    ),
+)
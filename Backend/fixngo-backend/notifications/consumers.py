@@ -0,0 +1,32 @@
+import json
+from channels.generic.websocket import AsyncWebsocketConsumer
+from users.models import User
+from .utils import notification_group
+
+
+class NotificationConsumer(AsyncWebsocketConsumer):
+    """
+    One socket per signed-in user tab. Each connection joins its user's
+    group, so `notify(user_id, ...)` reaches every open tab of that user.
+    """
+
+    async def connect(self):
+        user = self.scope["user"]
+        if not user.is_authenticated or not isinstance(user, User):
+            await self.close(code=4003)
+            return
+
+        self.group_name = notification_group(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        # Server-push only; anything a client sends is ignored
+        pass
+
+    async def notification(self, event):
+        await self.send(text_data=json.dumps({"type": "notification", **event["payload"]}))
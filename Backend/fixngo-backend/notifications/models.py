@@ -0,0 +1,43 @@
+from django.db import models
+from django.utils import timezone
+from users.models import User
+
+
+class Notification(models.Model):
+    """
+    Outbox row for a user notification. Written in the same transaction as
+    the change it announces, then pushed to the user's sockets by
+    `notifications.tasks.deliver_notifications`. Rows double as the user's
+    notification history for clients that were offline.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notifications")
+    message = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='notification_outbox_idx'),
+            models.Index(fields=['user', 'is_read', '-created_at'], name='notification_unread_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} [{self.status}]: {self.message}"
+
+    def to_payload(self):
+        return {
+            "id": self.id,
+            "message": self.message,
+            "created_at": self.created_at.isoformat(),
+        }
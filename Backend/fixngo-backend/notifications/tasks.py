@@ -0,0 +1,78 @@
+import logging
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import Notification
+from .client import notification_client
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_RETRY_BACKOFF = 30  # seconds, doubled on every retry
+NOTIFICATION_RETRY_BACKOFF_MAX = 600
+# How long a claimed batch is hidden from other workers while it is pushed
+NOTIFICATION_CLAIM_TIMEOUT = 60  # seconds
+
+
+@shared_task
+def deliver_notifications():
+    """
+    Push due outbox rows to connected clients, a batch at a time. Rows that
+    fail are retried with exponential backoff until NOTIFICATION_MAX_ATTEMPTS,
+    then marked failed; they stay readable through the REST endpoint either way.
+    """
+    delivered = 0
+    while True:
+        with transaction.atomic():
+            # skip_locked lets concurrent workers split the outbox between them
+            batch = list(
+                Notification.objects.select_for_update(skip_locked=True)
+                .filter(status='pending', next_attempt_at__lte=timezone.now())
+                .order_by('next_attempt_at', 'id')[:settings.NOTIFICATION_BATCH_SIZE]
+            )
+            if not batch:
+                break
+
+            # Claim the batch by pushing it out of the due window, so the row
+            # locks can be released before the slow network calls. A worker
+            # that dies mid-push leaves its rows due again once the claim lapses
+            due_at = {notification.id: notification.next_attempt_at for notification in batch}
+            Notification.objects.filter(id__in=due_at).update(
+                next_attempt_at=timezone.now() + timedelta(seconds=NOTIFICATION_CLAIM_TIMEOUT)
+            )
+
+        results = notification_client.push_many(
+            [(notification.user_id, notification.to_payload()) for notification in batch]
+        )
+
+        now = timezone.now()
+        for notification, result in zip(batch, results):
+            if result is None:
+                # Skipped by the open circuit: not an attempt, retried next sweep
+                notification.next_attempt_at = due_at[notification.id]
+                continue
+            if not result:
+                notification.attempts += 1
+                if notification.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+                    notification.status = 'failed'
+                else:
+                    backoff = min(
+                        NOTIFICATION_RETRY_BACKOFF * 2 ** (notification.attempts - 1),
+                        NOTIFICATION_RETRY_BACKOFF_MAX,
+                    )
+                    notification.next_attempt_at = now + timedelta(seconds=backoff)
+                continue
+
+            notification.status = 'sent'
+            notification.sent_at = now
+            delivered += 1
+
+        Notification.objects.bulk_update(batch, ['status', 'attempts', 'next_attempt_at', 'sent_at'])
+
+        # With the circuit open the rest of the outbox waits for the next sweep
+        if None in results:
+            break
+
+    logger.info("Notification delivery: %s", notification_client.stats())
+    return delivered
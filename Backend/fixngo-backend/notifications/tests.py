@@ -0,0 +1,65 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from notifications.models import Notification
+from notifications.tasks import deliver_notifications
+from users.models import User
+
+
+class MarkNotificationsReadTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reader', 'reader@example.com', 'pw', phone='9000000001')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.notification = Notification.objects.create(user=self.user, message="hello")
+
+    def test_rejects_non_integer_ids(self):
+        for ids in (["abc"], [self.notification.id, "2"], [True], "1"):
+            response = self.client.post('/api/notifications/mark-read/', {"ids": ids}, format='json')
+            self.assertEqual(response.status_code, 400, ids)
+        self.notification.refresh_from_db()
+        self.assertFalse(self.notification.is_read)
+
+    def test_marks_given_ids_read(self):
+        response = self.client.post('/api/notifications/mark-read/', {"ids": [self.notification.id]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["updated"], 1)
+
+
+class DeliverNotificationsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('outbox', 'outbox@example.com', 'pw', phone='9000000002')
+        due_at = timezone.now() - timedelta(minutes=1)
+        self.notifications = [
+            Notification.objects.create(user=self.user, message=f"note {i}", next_attempt_at=due_at)
+            for i in range(3)
+        ]
+
+    def test_claims_batch_before_pushing_and_records_results(self):
+        claimed_until = []
+
+        def push_many(messages):
+            # Rows are already claimed while the push is in flight
+            claimed_until.extend(
+                Notification.objects.filter(id__in=[n.id for n in self.notifications])
+                .values_list('next_attempt_at', flat=True)
+            )
+            return [True, False, None]
+
+        with mock.patch('notifications.tasks.notification_client.push_many', side_effect=push_many):
+            delivered = deliver_notifications()
+
+        self.assertEqual(delivered, 1)
+        self.assertTrue(all(until > timezone.now() for until in claimed_until))
+
+        sent, failed, skipped = (Notification.objects.get(id=n.id) for n in self.notifications)
+        self.assertEqual(sent.status, 'sent')
+        self.assertEqual((failed.status, failed.attempts), ('pending', 1))
+        self.assertGreater(failed.next_attempt_at, timezone.now())
+        # Skipped by the open circuit: due again straight away, not after the claim
+        self.assertEqual((skipped.status, skipped.attempts), ('pending', 0))
+        self.assertEqual(skipped.next_attempt_at, self.notifications[2].next_attempt_at)
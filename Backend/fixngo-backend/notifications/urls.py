@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import UnreadNotificationsView, MarkNotificationsReadView
+
+urlpatterns = [
+    path('unread/', UnreadNotificationsView.as_view(), name='unread-notifications'),
+    path('mark-read/', MarkNotificationsReadView.as_view(), name='mark-notifications-read'),
+]
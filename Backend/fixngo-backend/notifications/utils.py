@@ -0,0 +1,21 @@
+from django.db import transaction
+
+
+def notification_group(user_id):
+    return f"notifications_user_{user_id}"
+
+
+def notify(user_id, message):
+    """
+    Queue a notification for `user_id` in the caller's transaction, so it is
+    stored if and only if the change it announces commits. Delivery happens
+    in the background once the transaction commits; the write path never
+    waits on the channel layer, and if the task cannot be queued the
+    periodic sweep picks the row up instead.
+    """
+    from .models import Notification
+    from .tasks import deliver_notifications
+
+    notification = Notification.objects.create(user_id=user_id, message=message)
+    transaction.on_commit(lambda: deliver_notifications.delay(), robust=True)
+    return notification
@@ -0,0 +1,44 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.generics import ListAPIView
+from rest_framework.pagination import PageNumberPagination
+from .models import Notification
+from .serializers import NotificationSerializer
+
+
+class NotificationPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class UnreadNotificationsView(ListAPIView):
+    """Unread notifications of the logged-in user, newest first, for catching up after being offline."""
+    permission_classes = [IsAuthenticated]
+    serializer_class = NotificationSerializer
+    pagination_class = NotificationPagination
+
+    def get_queryset(self):
+        return Notification.objects.filter(user=self.request.user, is_read=False).order_by('-created_at')
+
+
+class MarkNotificationsReadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        # Mark the given notification ids read, or all of them if none are given
+        ids = request.data.get("ids")
+        if ids is not None and (
+            not isinstance(ids, list)
+            or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids)
+        ):
+            return Response({"error": "ids must be a list of integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        notifications = Notification.objects.filter(user=request.user, is_read=False)
+        if ids is not None:
+            notifications = notifications.filter(id__in=ids)
+        updated = notifications.update(is_read=True)
+
+        return Response({"success": True, "updated": updated})
@@ -1,3 +1,86 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from chat.models import Message, build_room_name
+from chat.write_buffer import persist_messages
+from users.models import User
+from workshop.models import Workshop
+
+
+class UserChatThreadsQueryCountTests(TestCase):
+    """The thread list costs the same number of queries however many threads a user has."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('chatter', 'chatter@example.com', 'pw', phone='9000000000')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.workshop_count = 0
+
+    def add_threads(self, count, messages_per_thread=3):
+        messages = []
+        for _ in range(count):
+            self.workshop_count += 1
+            workshop = Workshop.objects.create(
+                name=f"workshop {self.workshop_count}",
+                email=f"workshop{self.workshop_count}@example.com",
+                phone=f"8{self.workshop_count:09d}",
+                location="Kochi",
+            )
+            room_name = build_room_name(self.user.id, workshop.id)
+            for i in range(messages_per_thread):
+                if i % 2:
+                    messages.append(Message(room_name=room_name, message=f"reply {i}", sender_workshop=workshop, receiver_user=self.user))
+                else:
+                    messages.append(Message(room_name=room_name, message=f"hello {i}", sender_user=self.user, receiver_workshop=workshop))
+        persist_messages(messages)
+
+    def count_queries(self, expected_threads):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/users/chat/threads/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), expected_threads)
+        return len(queries)
+
+    def test_query_count_is_independent_of_thread_count(self):
+        self.add_threads(3)
+        few = self.count_queries(3)
+
+        self.add_threads(3 * 9)
+        many = self.count_queries(30)
+
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, 2)
+
+    def test_pinned_query_count(self):
+        self.add_threads(10)
+        with self.assertNumQueries(1):
+            self.client.get('/api/users/chat/threads/')
+
+
+class DistanceCursorPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('nearby', 'nearby@example.com', 'pw', phone='9400000000')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for n in range(4):
+            Workshop.objects.create(
+                name=f"nearby {n}", email=f"nearby{n}@example.com", phone=f"94000000{n:02d}", location="Kochi",
+                latitude=9.97 + n / 100, longitude=76.28, is_approved=True, approval_status="approved",
+                document=f"documents/nearby{n}.pdf",
+            )
+        self.params = {'sort': 'distance', 'pagination': 'cursor', 'latitude': 9.97, 'longitude': 76.28, 'page_size': 3}
+
+    def test_cursor_walks_workshops_by_distance(self):
+        first = self.client.get('/api/users/workshops/list/', self.params).json()
+        second = self.client.get(first['next']).json()
+
+        names = [workshop['name'] for workshop in first['results'] + second['results']]
+        self.assertEqual(names, [f"nearby {n}" for n in range(4)])
+        self.assertIsNone(second['next'])
+
+    def test_malformed_cursor_is_a_bad_request(self):
+        for cursor in ('not-a-cursor', 'W10=', '%%%'):
+            response = self.client.get('/api/users/workshops/list/', {**self.params, 'cursor': cursor})
+            self.assertEqual(response.status_code, 400, cursor)
@@ -17,7 +17,7 @@ from django.http import JsonResponse
 from workshop.models import Workshop, WorkshopService
 from .tasks import send_otp_email
 from django.utils.http import urlsafe_base64_decode
-from workshop.utils import haversine
+from workshop.utils import haversine_batch, haversine_expression, geohash_cells_query
 from workshop.serializers import WorkshopSerializer, WorkshopServiceSerializer
 from datetime import datetime
 from itertools import chain
@@ -34,13 +34,17 @@ from rest_framework.decorators import api_view
 from rest_framework import status
 from django.conf import settings
 from utils.s3_utils import get_s3_file_url
-from math import radians, cos
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, BasePagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.urls import replace_query_param
+import base64
 from django.db.models import F, Q, Avg
+from django.db import transaction
 from django.db.models.expressions import RawSQL
 import math
-from chat.models import Message
+from chat.models import Message, ArchivedMessage, ChatThread, parse_room_name
 from chat.serializers import MessageSerializer
+from chat.pagination import MessageCursorPagination
 
 # Create your views here.
 
@@ -514,50 +518,63 @@ class NearbyWorkshopsView(APIView):
          # Define a radius (in km)
          radius_km = 10
  
-         # Approximate calculation for bounding box (more efficient)
-         lat_delta = radius_km / 111  # ~111 km per degree of latitude
-         lon_delta = radius_km / (111 * cos(radians(user_lat)))
- 
-         min_lat = user_lat - lat_delta
-         max_lat = user_lat + lat_delta
-         min_lon = user_lon - lon_delta
-         max_lon = user_lon + lon_delta
+         # Optional page window over the distance-sorted results
+         try:
+             offset = max(int(request.GET.get('offset', 0)), 0)
+             limit = request.GET.get('limit')
+             limit = max(int(limit), 0) if limit is not None else None
+         except (TypeError, ValueError):
+             return Response({"error": "Invalid limit or offset"}, status=400)
  
-         # Filter in DB using bounding box
-         workshops = Workshop.objects.filter(
+         # Look up only the geohash cells surrounding the user (indexed),
+         # fetching just the coordinates of each candidate
+         candidates = list(Workshop.objects.filter(
+             geohash_cells_query(user_lat, user_lon, radius_km),
              is_active=True,
              is_approved=True,
-             latitude__range=(min_lat, max_lat),
-             longitude__range=(min_lon, max_lon)
-         )
+             latitude__isnull=False,
+             longitude__isnull=False,
+         ).order_by('id').values_list('id', 'latitude', 'longitude'))
  
-         # Calculate distances using the Haversine formula
-         nearby_workshops = []
-         for workshop in workshops:
-             if workshop.latitude is not None and workshop.longitude is not None:
-                 try:
-                     distance = haversine(user_lat, user_lon, workshop.latitude, workshop.longitude)
-                     print("distance: ", distance)
-                     if distance <= radius_km:  # Only include if truly within radius
-                         nearby_workshops.append({
-                             "id": workshop.id,
-                             "name": workshop.name,
-                             "email": workshop.email,
-                             "phone": workshop.phone,
-                             "location": workshop.location,
-                             "latitude": workshop.latitude,
-                             "longitude": workshop.longitude,
-                             "distance": round(distance, 2),
-                             "document": workshop.document.url if workshop.document else None,
-                            #  "profile_image": workshop.profile_image.url if workshop.profile_image else None,
-                         })
-                 except ValueError:
-                     continue
+         # Compute all distances in one vectorized pass, keeping only the
+         # nearest workshops within the radius that the page needs
+         if candidates:
+             ids, latitudes, longitudes = zip(*candidates)
+             top_k = offset + limit if limit is not None else len(ids)
+             indices, distances = haversine_batch(
+                 user_lat, user_lon, latitudes, longitudes, radius_km=radius_km, top_k=top_k
+             )
+             page = [(ids[i], distance) for i, distance in zip(indices[offset:], distances[offset:])]
+         else:
+             page = []
  
-         # Sort workshops by distance within 10km
-         sorted_workshops = sorted(nearby_workshops, key=lambda x: x["distance"])
+         # Load full rows for the returned page only
+         workshops_by_id = Workshop.objects.only(
+             'id', 'name', 'email', 'phone', 'location', 'latitude', 'longitude', 'document'
+         ).in_bulk([workshop_id for workshop_id, _ in page])
+         workshops = []
+         for workshop_id, distance in page:
+             workshop = workshops_by_id[workshop_id]
+             workshop.distance = float(distance)
+             workshops.append(workshop)
  
-         return Response(sorted_workshops, status=200)
+         nearby_workshops = [
+             {
+                 "id": workshop.id,
+                 "name": workshop.name,
+                 "email": workshop.email,
+                 "phone": workshop.phone,
+                 "location": workshop.location,
+                 "latitude": workshop.latitude,
+                 "longitude": workshop.longitude,
+                 "distance": round(workshop.distance, 2),
+                 "document": workshop.document.url if workshop.document else None,
+                #  "profile_image": workshop.profile_image.url if workshop.profile_image else None,
+             }
+             for workshop in workshops
+         ]
+ 
+         return Response(nearby_workshops, status=200)
 
 
 class UserWorkshopPagination(PageNumberPagination):
@@ -565,6 +582,73 @@ class UserWorkshopPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
 
+
+class DistanceCursorPagination(BasePagination):
+    """
+    Keyset pagination over a queryset annotated with `distance`.
+    
+    The cursor encodes the (distance, id) of the last row on the page, so every
+    page is a single indexed-range query and page N costs the same as page 1.
+    """
+    page_size = 6
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            distance, pk = cursor
+            queryset = queryset.filter(
+                Q(distance__gt=distance) | Q(distance=distance, id__gt=pk)
+            )
+
+        # Fetch one extra row to know whether another page exists
+        results = list(queryset.order_by('distance', 'id')[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            distance, pk = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            return float(distance), int(pk)
+        except (TypeError, ValueError, UnicodeEncodeError):
+            raise ValidationError(self.invalid_cursor_message)
+
+    def encode_cursor(self, workshop):
+        payload = json.dumps([workshop.distance, workshop.id])
+        return base64.urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data,
+        })
+
 class UserWorkshopsListView(ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = WorkshopSerializer
@@ -595,60 +679,62 @@ class UserWorkshopsListView(ListAPIView):
             return queryset.order_by('name', 'location')
         elif sort_param == '-created_at':
             return queryset.order_by('-created_at')
+        elif sort_param == 'distance':
+            coordinates = self.get_user_coordinates()
+            if coordinates:
+                # Distance is computed, ordered and paginated by the database
+                return queryset.filter(
+                    latitude__isnull=False,
+                    longitude__isnull=False
+                ).annotate(
+                    distance=haversine_expression(*coordinates)
+                ).order_by('distance', 'id')
         
         return queryset
     
+    @property
+    def paginator(self):
+        """Use keyset pagination for `sort=distance&pagination=cursor` requests."""
+        if not hasattr(self, '_paginator'):
+            query_params = self.request.query_params
+            if (
+                query_params.get('pagination') == 'cursor'
+                and query_params.get('sort') == 'distance'
+                and self.get_user_coordinates()
+            ):
+                self._paginator = DistanceCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+    
+    def get_user_coordinates(self):
+        """Return the (latitude, longitude) query params as floats, or None."""
+        try:
+            return (
+                float(self.request.query_params.get('latitude')),
+                float(self.request.query_params.get('longitude')),
+            )
+        except (TypeError, ValueError):
+            return None
+    
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
         
-        # Handle distance-based sorting if needed
-        sort_param = self.request.query_params.get('sort', None)
-        user_lat = self.request.query_params.get('latitude')
-        user_lng = self.request.query_params.get('longitude')
-        print(f"lat {user_lat} and lon {user_lng}")
+        # Only the requested page is fetched (LIMIT/OFFSET) and serialized
+        page = self.paginate_queryset(queryset)
+        workshops = page if page is not None else queryset
+        serializer = self.get_serializer(workshops, many=True)
+        data = serializer.data
         
-        # If sorting by distance and coordinates are provided
-        if sort_param == 'distance' and user_lat and user_lng:
-            try:
-                user_lat = float(user_lat)
-                user_lng = float(user_lng)
-                
-                # Filter out workshops without coordinates
-                valid_workshops = []
-                for workshop in queryset:
-                    if workshop.latitude is None or workshop.longitude is None:
-                        continue
-                        
-                    try:
-                        # Calculate distance using Haversine formula from utils
-                        distance = haversine(user_lat, user_lng, workshop.latitude, workshop.longitude)
-                        # Create a dictionary with workshop data and distance
-                        workshop_dict = self.get_serializer(workshop).data
-                        workshop_dict['distance'] = round(distance, 2)
-                        valid_workshops.append(workshop_dict)
-                    except ValueError:
-                        continue
-                
-                # Sort by distance
-                sorted_workshops = sorted(valid_workshops, key=lambda x: x["distance"])
-                
-                # Handle pagination manually
-                page = self.paginate_queryset(sorted_workshops)
-                if page is not None:
-                    return self.get_paginated_response(page)
-                    
-                return Response(sorted_workshops)
-            except (ValueError, TypeError):
-                pass
+        # Attach the database-computed distance when sorting by distance
+        for workshop, workshop_dict in zip(workshops, data):
+            distance = getattr(workshop, 'distance', None)
+            if distance is not None:
+                workshop_dict['distance'] = round(distance, 2)
         
-        # If not sorting by distance or coordinates are invalid, use regular pagination
-        page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-            
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+            return self.get_paginated_response(data)
+        return Response(data)
     
 class UserWorkshopDetailView(RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -799,17 +885,19 @@ class VerifyPaymentAPIView(APIView):
                 "razorpay_signature": razorpay_signature,
             })
 
-            # Payment is verified
-            payment.razorpay_payment_id = razorpay_payment_id
-            payment.razorpay_signature = razorpay_signature
-            payment.status = "SUCCESS"
-            payment.save()
-            
-            # Remove the service request associated with this payment
-            service_request = payment.service_request
-            service_request.status = "COMPLETED"
-            service_request.payment_status = "PAID"
-            service_request.save()
+            # Payment is verified. Both rows (and the dashboard counters
+            # their signals update) change together or not at all
+            with transaction.atomic():
+                payment.razorpay_payment_id = razorpay_payment_id
+                payment.razorpay_signature = razorpay_signature
+                payment.status = "SUCCESS"
+                payment.save()
+                
+                # Remove the service request associated with this payment
+                service_request = payment.service_request
+                service_request.status = "COMPLETED"
+                service_request.payment_status = "PAID"
+                service_request.save()
 
             return Response({"message": "Payment verified successfully."}, status=status.HTTP_200_OK)
         except Exception as e:
@@ -956,16 +1044,26 @@ class UserChatHistoryAPIView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
                 
-            # Construct the room name based on the convention
-            room_name = f"chat_{user.id}_{workshop_id}"
-            
-            # Get messages for this room
-            messages = Message.objects.filter(room_name=room_name)
+            # Get messages for this room by its typed key, with both
+            # participants joined in, one page at a time (see
+            # MessageCursorPagination for cursors). Older pages continue
+            # into the archive once the hot table is exhausted
+            participants = ('sender_user', 'sender_workshop', 'receiver_user', 'receiver_workshop')
+            messages = Message.objects.filter(
+                room_user_id=user.id, room_workshop_id=workshop.id
+            ).select_related(*participants)
+            archived = ArchivedMessage.objects.filter(
+                room_user_id=user.id, room_workshop_id=workshop.id
+            ).select_related(*participants)
+            paginator = MessageCursorPagination(archive=archived)
+            page = paginator.paginate_queryset(messages, request, view=self)
             
             # Serialize and return the messages
-            serializer = MessageSerializer(messages, many=True)
-            return Response(serializer.data)
+            serializer = MessageSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
             
+        except ValidationError as e:
+            return Response({"error": str(e.detail[0])}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response(
                 {"error": str(e)},
@@ -983,43 +1081,38 @@ class UserChatThreadsAPIView(APIView):
         try:
             user = request.user
             
-            # Fetch messages involving the current user
-            messages = Message.objects.filter(
-                Q(sender_user=user) | Q(receiver_user=user)
-            ).order_by('room_name', '-timestamp').distinct('room_name')
+            # Optional page window over the threads, newest first
+            try:
+                offset = max(int(request.GET.get('offset', 0)), 0)
+                limit = request.GET.get('limit')
+                limit = max(int(limit), 0) if limit is not None else None
+            except (TypeError, ValueError):
+                return Response({"error": "Invalid limit or offset"}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Thread summaries are maintained as messages are written, so the
+            # list is a single indexed read with the workshop joined in
+            chat_threads = ChatThread.objects.filter(
+                user=user, workshop__isnull=False
+            ).select_related('workshop').order_by('-last_timestamp', '-id')
+            chat_threads = chat_threads[offset:offset + limit] if limit is not None else chat_threads[offset:]
 
             threads = []
             
-            for msg in messages:
-                workshop = None
-                
-                # Determine which workshop the user is chatting with
-                if msg.sender_workshop:
-                    workshop = msg.sender_workshop
-                elif msg.receiver_workshop:
-                    workshop = msg.receiver_workshop
-                
-                if not workshop:
-                    continue
-
-                # Count unread messages in this thread
-                unread_count = Message.objects.filter(
-                    room_name=msg.room_name,
-                    is_read=False
-                ).exclude(sender_user=user).count()
+            for chat_thread in chat_threads:
+                workshop = chat_thread.workshop
 
                 # Build thread response with workshop details
                 thread = {
-                    'id': msg.room_name,
+                    'id': chat_thread.room_name,
                     'workshop_details': {
                         'id': workshop.id,
                         'name': workshop.name,
                         'document': workshop.document.url if workshop.document and hasattr(workshop.document, 'name') else '/default-avatar.png'
                     },
-                    'last_message': msg.message,
-                    'last_message_timestamp': msg.timestamp,
-                    'unread_count': unread_count,
-                    'created_at': msg.timestamp
+                    'last_message': chat_thread.last_message,
+                    'last_message_timestamp': chat_thread.last_timestamp,
+                    'unread_count': chat_thread.user_unread_count,
+                    'created_at': chat_thread.last_timestamp
                 }
                 
                 threads.append(thread)
@@ -1039,18 +1132,16 @@ class UserMarkMessagesReadView(APIView):
         try:
             user = request.user
             
-            # Parse room ID to extract workshop ID
+            # Validate the room ID
             # Format: chat_[user_id]_[workshop_id]
-            parts = room_id.split('_')
-            if len(parts) != 3:
+            try:
+                parse_room_name(room_id)
+            except ValueError:
                 return Response({"error": "Invalid room ID format"}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Mark all messages as read where the user is the receiver
-            Message.objects.filter(
-                room_name=room_id,
-                receiver_user=user,
-                is_read=False
-            ).update(is_read=True)
+            # Move the user's read watermark up to the latest message; a
+            # single-row write however many messages were unread
+            ChatThread.mark_read(room_id, user=user)
             
             return Response({"success": True})
             
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.cache import cache
+from users.models import User
+from workshop.models import Workshop
+
+PRINCIPAL_MODELS = {
+    'user': User,
+    'workshop': Workshop,
+}
+
+# The only columns kept in the shared cache: what authentication and
+# permission checks read, plus the email the chat consumer stamps on
+# messages. Password hashes, KYC documents and contact details never leave
+# the database; they load on first access like any deferred field
+PRINCIPAL_FIELDS = {
+    'user': ('id', 'email', 'is_active', 'is_verified', 'is_staff', 'is_superuser'),
+    'workshop': ('id', 'email', 'is_active', 'is_verified', 'is_staff', 'is_approved', 'approval_status'),
+}
+
+
+def principal_cache_key(principal_type, principal_id):
+    # v2: entries are field dicts; v1 held pickled model instances
+    return f"principal:v2:{principal_type}:{principal_id}"
+
+
+def build_principal(model, fields):
+    """Rebuild a model instance from cached `fields`, deferring every other column."""
+    loaded = [field for field in model._meta.concrete_fields if field.attname in fields]
+    return model.from_db(
+        model.objects.db,
+        [field.attname for field in loaded],
+        [fields[field.attname] for field in loaded],
+    )
+
+
+def get_principal(principal_type, principal_id):
+    """
+    Return the User or Workshop for a token's (type, id), built from the
+    shared cache when possible. Only PRINCIPAL_FIELDS are loaded up front.
+    Returns None if no such row exists.
+    """
+    model = PRINCIPAL_MODELS.get(principal_type)
+    if model is None or not principal_id:
+        return None
+
+    key = principal_cache_key(principal_type, principal_id)
+    fields = cache.get(key)
+    if fields is None:
+        fields = model.objects.filter(pk=principal_id).values(*PRINCIPAL_FIELDS[principal_type]).first()
+        if fields is None:
+            return None
+        cache.set(key, fields, settings.PRINCIPAL_CACHE_TTL)
+    return build_principal(model, fields)
+
+
+def invalidate_principal(principal_type, principal_id):
+    cache.delete(principal_cache_key(principal_type, principal_id))
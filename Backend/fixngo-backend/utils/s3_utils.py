@@ -1,5 +1,9 @@
 import boto3, logging
+import threading
+import time
 import urllib.parse
+import redis
+from cachetools import TLRUCache
 from django.conf import settings
 from rest_framework.response import Response
 from rest_framework import status
@@ -19,6 +23,28 @@ s3 = boto3.client(
     region_name=region_name,
 )
 
+# Presigned URL cache: entries expire a safety margin before the signature does
+PRESIGNED_URL_EXPIRATION = 3600
+PRESIGNED_URL_SAFETY_MARGIN = 300
+PRESIGNED_URL_CACHE_TTL = PRESIGNED_URL_EXPIRATION - PRESIGNED_URL_SAFETY_MARGIN
+PRESIGNED_URL_REDIS_PREFIX = "presigned_url:"
+
+# Process-local LRU front tier. Values are (url, expires_at) and each entry
+# lives only until its own expires_at: a URL taken from Redis keeps the
+# time it had left there instead of starting a fresh TTL
+presigned_url_cache = TLRUCache(
+    maxsize=settings.PRESIGNED_URL_CACHE_SIZE,
+    ttu=lambda key, value, now: value[1],
+    timer=time.monotonic,
+)
+presigned_url_cache_lock = threading.Lock()
+
+# Optional Redis shared tier, enabled by PRESIGNED_URL_REDIS_URL
+presigned_url_redis = (
+    redis.Redis.from_url(settings.PRESIGNED_URL_REDIS_URL, decode_responses=True)
+    if settings.PRESIGNED_URL_REDIS_URL else None
+)
+
 # Function to get S3 file URL
 def get_s3_file_url(file_name, s3_file_path):
     encoded_file_name = urllib.parse.quote(file_name)
@@ -79,3 +105,73 @@ def generate_presigned_url(document_url, expiration=3600):
 
     # The response contains the presigned URL
     return response
+
+
+
+def get_cached_presigned_url(document_key):
+    """Return a presigned URL for an S3 object, signing it only on a cache miss."""
+    return get_cached_presigned_urls([document_key]).get(document_key)
+
+
+def get_cached_presigned_urls(document_keys):
+    """Return a {key: presigned URL} map, batch-signing only the uncached keys.
+
+    Keys are looked up in the process-local cache first, then in Redis (one
+    MGET for all remaining keys), and only what is still missing is signed.
+    """
+    urls = {}
+    with presigned_url_cache_lock:
+        for key in document_keys:
+            entry = presigned_url_cache.get(key)
+            if entry is not None:
+                urls[key] = entry[0]
+
+    missing = [key for key in dict.fromkeys(document_keys) if key not in urls]
+    if not missing:
+        return urls
+
+    # key -> (url, seconds of cache life left)
+    shared = {}
+    if presigned_url_redis is not None:
+        try:
+            redis_keys = [PRESIGNED_URL_REDIS_PREFIX + key for key in missing]
+            pipeline = presigned_url_redis.pipeline(transaction=False)
+            pipeline.mget(redis_keys)
+            for redis_key in redis_keys:
+                pipeline.pttl(redis_key)
+            values, *ttls = pipeline.execute()
+            shared = {
+                key: (value, ttl / 1000)
+                for key, value, ttl in zip(missing, values, ttls)
+                if value and ttl > 0
+            }
+        except redis.RedisError as e:
+            logging.error(e)
+
+    signed = {}
+    for key in missing:
+        if key in shared:
+            continue
+        url = generate_presigned_url(key, expiration=PRESIGNED_URL_EXPIRATION)
+        if url:
+            signed[key] = url
+
+    if signed and presigned_url_redis is not None:
+        try:
+            pipeline = presigned_url_redis.pipeline(transaction=False)
+            for key, url in signed.items():
+                pipeline.set(PRESIGNED_URL_REDIS_PREFIX + key, url, ex=PRESIGNED_URL_CACHE_TTL)
+            pipeline.execute()
+        except redis.RedisError as e:
+            logging.error(e)
+
+    now = time.monotonic()
+    with presigned_url_cache_lock:
+        for key, (url, remaining) in shared.items():
+            presigned_url_cache[key] = (url, now + remaining)
+        for key, url in signed.items():
+            presigned_url_cache[key] = (url, now + PRESIGNED_URL_CACHE_TTL)
+
+    urls.update({key: url for key, (url, _) in shared.items()})
+    urls.update(signed)
+    return urls
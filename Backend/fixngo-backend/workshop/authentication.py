@@ -1,13 +1,10 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from workshop.models import Workshop
+from utils.principal_cache import get_principal
 
 class WorkshopJWTAuthentication(JWTAuthentication):
     def get_user(self, validated_token):
-        try:
-            user_id = validated_token.get("user_id")
-            if not user_id:
-                return None
-            return Workshop.objects.get(pk=user_id)
-        except Workshop.DoesNotExist:
+        user_id = validated_token.get("user_id")
+        if not user_id:
             return None
+        return get_principal("workshop", user_id)
 
@@ -0,0 +1,127 @@
+import re
+import threading
+import unicodedata
+from datetime import timedelta
+from cachetools import TTLCache
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from geopy.geocoders import Nominatim
+
+
+class BaseGeocoder:
+    """
+    Geocoder backend interface. `geocode` returns (latitude, longitude) or
+    (None, None) when the address cannot be resolved, and raises
+    geopy.exc.GeocoderServiceError on transient failures so callers can retry.
+    """
+
+    def geocode(self, address):
+        raise NotImplementedError
+
+
+class NominatimGeocoder(BaseGeocoder):
+    def __init__(self):
+        self.client = Nominatim(user_agent="fixngo", timeout=settings.GEOCODER_TIMEOUT)
+
+    def geocode(self, address):
+        location = self.client.geocode(address)
+        if location:
+            return location.latitude, location.longitude
+        return None, None
+
+
+class FixtureGeocoder(BaseGeocoder):
+    """
+    Resolves addresses from settings.GEOCODER_FIXTURES without any network
+    call. A fixture that is an exception is raised instead, to exercise the
+    retry path.
+    """
+
+    def geocode(self, address):
+        coordinates = getattr(settings, "GEOCODER_FIXTURES", {}).get(address)
+        if isinstance(coordinates, Exception):
+            raise coordinates
+        if coordinates:
+            return coordinates
+        return None, None
+
+
+def normalize_address(address):
+    """
+    Normalize an address into a cache key: unicode-folded, lowercased, with
+    punctuation dropped and whitespace collapsed, so that near-identical
+    strings ("12, MG Road,  Kochi" / "12 mg road kochi") share one entry.
+    """
+    address = unicodedata.normalize("NFKC", address or "").casefold()
+    return " ".join(re.findall(r"\w+", address))[:255]
+
+
+class CachedGeocoder(BaseGeocoder):
+    """
+    Wraps a geocoder backend with an in-process LRU in front of the persistent
+    GeocodeCache table. Only cache misses reach the backend.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.ttl = timedelta(seconds=settings.GEOCODE_CACHE_TTL)
+        self.local_cache = TTLCache(maxsize=settings.GEOCODE_CACHE_SIZE, ttl=settings.GEOCODE_CACHE_TTL)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def geocode(self, address):
+        from .models import GeocodeCache
+
+        key = normalize_address(address)
+        if not key:
+            return None, None
+
+        with self.lock:
+            coordinates = self.local_cache.get(key)
+            if coordinates:
+                self.hits += 1
+                return coordinates
+
+        entry = GeocodeCache.objects.filter(
+            address_key=key, updated_at__gte=timezone.now() - self.ttl
+        ).first()
+        if entry:
+            GeocodeCache.objects.filter(pk=entry.pk).update(hit_count=F('hit_count') + 1)
+            coordinates = (entry.latitude, entry.longitude)
+            with self.lock:
+                self.hits += 1
+                self.local_cache[key] = coordinates
+            return coordinates
+
+        with self.lock:
+            self.misses += 1
+
+        latitude, longitude = self.backend.geocode(address)
+        if latitude is None or longitude is None:
+            return None, None
+
+        GeocodeCache.objects.update_or_create(
+            address_key=key,
+            defaults={'latitude': latitude, 'longitude': longitude},
+        )
+        with self.lock:
+            self.local_cache[key] = (latitude, longitude)
+        return latitude, longitude
+
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'local_size': len(self.local_cache)}
+
+
+_geocoder = None
+
+
+def get_geocoder():
+    """Return the configured geocoder backend behind the geocode cache, built once per process."""
+    global _geocoder
+    if _geocoder is None:
+        _geocoder = CachedGeocoder(import_string(settings.GEOCODER_BACKEND)())
+    return _geocoder
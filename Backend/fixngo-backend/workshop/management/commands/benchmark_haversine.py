@@ -0,0 +1,54 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from workshop.utils import haversine, haversine_batch
+
+
+class Command(BaseCommand):
+    help = "Benchmark the scalar haversine loop against the vectorized haversine_batch"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--radius', type=float, default=10.0)
+        parser.add_argument('--top-k', type=int, default=6)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        origin_lat, origin_lon = 10.0, 76.3
+
+        self.stdout.write(f"{'points':>10} {'scalar (ms)':>12} {'batch (ms)':>12} {'speedup':>9}")
+        for size in options['sizes']:
+            latitudes = [origin_lat + rng.uniform(-1, 1) for _ in range(size)]
+            longitudes = [origin_lon + rng.uniform(-1, 1) for _ in range(size)]
+
+            scalar = self.best_of(options['repeat'], lambda: self.scalar_search(
+                origin_lat, origin_lon, latitudes, longitudes, options['radius'], options['top_k']
+            ))
+            batch = self.best_of(options['repeat'], lambda: haversine_batch(
+                origin_lat, origin_lon, latitudes, longitudes,
+                radius_km=options['radius'], top_k=options['top_k']
+            ))
+
+            self.stdout.write(
+                f"{size:>10} {scalar * 1000:>12.2f} {batch * 1000:>12.2f} {scalar / batch:>8.1f}x"
+            )
+
+    def scalar_search(self, lat, lon, latitudes, longitudes, radius_km, top_k):
+        # Mirrors the old per-row view loop: compute, filter, sort, slice
+        nearby = []
+        for index, (point_lat, point_lon) in enumerate(zip(latitudes, longitudes)):
+            distance = haversine(lat, lon, point_lat, point_lon)
+            if distance <= radius_km:
+                nearby.append((distance, index))
+        return sorted(nearby)[:top_k]
+
+    def best_of(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
@@ -0,0 +1,92 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+
+from users.models import User, ServiceRequest
+from workshop.models import Workshop, WorkshopService
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed workshops with many services inside a rolled-back transaction and compare "
+        "per-service booking counts against the single annotated query of WorkshopServicesAPIView"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--services', type=int, nargs='+', default=[10, 100, 500])
+        parser.add_argument('--bookings-per-service', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'services':>9} {'per-service (ms)':>17} {'queries':>8} {'annotated (ms)':>15} {'queries':>8} {'speedup':>9}"
+        )
+
+        # Everything seeded below is rolled back
+        with transaction.atomic():
+            user = User.objects.create(
+                username="services-bench", email="services-bench@example.com",
+                phone="svcbench", profile_image_url="",
+            )
+            for index, size in enumerate(options['services']):
+                workshop = self.seed_workshop(index, size, user, options['bookings_per_service'])
+
+                per_service, per_service_queries = self.measure(options['repeat'], lambda: self.per_service_counts(workshop))
+                annotated, annotated_queries = self.measure(options['repeat'], lambda: self.annotated_counts(workshop))
+
+                self.stdout.write(
+                    f"{size:>9} {per_service * 1000:>17.2f} {per_service_queries:>8} "
+                    f"{annotated * 1000:>15.2f} {annotated_queries:>8} {per_service / annotated:>8.1f}x"
+                )
+
+            transaction.set_rollback(True)
+
+    def seed_workshop(self, index, size, user, bookings_per_service):
+        workshop = Workshop.objects.create(
+            name=f"services-bench-{index}",
+            email=f"services-bench-{index}@example.com",
+            phone=f"svcbench{index}",
+            location="benchmark",
+            profile_image="",
+        )
+        services = WorkshopService.objects.bulk_create([
+            WorkshopService(workshop=workshop, name=f"service {i}", description="benchmark", base_price=100)
+            for i in range(size)
+        ])
+        ServiceRequest.objects.bulk_create([
+            ServiceRequest(
+                user=user, workshop=workshop, workshop_service=service,
+                vehicle_type="car", description="benchmark",
+            )
+            for service in services
+            for _ in range(bookings_per_service)
+        ], batch_size=5000)
+        return workshop
+
+    def per_service_counts(self, workshop):
+        # Mirrors the old view loop: one COUNT per service
+        return [
+            (service.id, ServiceRequest.objects.filter(workshop_service=service).count())
+            for service in WorkshopService.objects.filter(workshop=workshop)
+        ]
+
+    def annotated_counts(self, workshop):
+        # The query WorkshopServicesAPIView issues now
+        return [
+            (service.id, service.bookings_count)
+            for service in WorkshopService.objects.filter(workshop=workshop).annotate(
+                bookings_count=Count('servicerequest')
+            )
+        ]
+
+    def measure(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+        return min(timings), len(queries)
@@ -0,0 +1,71 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:13
+
+from django.db import migrations, models
+
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(latitude, longitude, precision=9):
+    # Frozen copy of workshop.utils.geohash_encode, so this migration does
+    # not depend on app code (or the numpy/geocoder imports behind it)
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(geohash) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits = bits << 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits = bits << 1
+                lat_range[1] = mid
+
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(geohash)
+
+
+def backfill_geohash(apps, schema_editor):
+    Workshop = apps.get_model('workshop', 'Workshop')
+    workshops = Workshop.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    for workshop in workshops.iterator():
+        workshop.geohash = geohash_encode(workshop.latitude, workshop.longitude)
+        workshop.save(update_fields=['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshop', '0026_alter_workshopotp_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workshop',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, max_length=9, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='workshop',
+            index=models.Index(fields=['is_active', 'is_approved', 'geohash'], name='workshop_active_geohash_idx'),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:16
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def mark_geocoded_workshops(apps, schema_editor):
+    Workshop = apps.get_model('workshop', 'Workshop')
+    Workshop.objects.filter(latitude__isnull=False, longitude__isnull=False).update(geocoding_status='success')
+    Workshop.objects.filter(Q(latitude__isnull=True) | Q(longitude__isnull=True)).update(geocoding_status='failed')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshop', '0027_workshop_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workshop',
+            name='geocoding_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('success', 'Success'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.RunPython(mark_geocoded_workshops, migrations.RunPython.noop),
+    ]
@@ -3,6 +3,7 @@ from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.core.validators import FileExtensionValidator
 from service.models import Service
 from django.utils import timezone
+from .utils import geohash_encode, GEOHASH_PRECISION
 
 
 class WorkshopManager(BaseUserManager):
@@ -21,6 +22,8 @@ class Workshop(AbstractBaseUser):
     location    = models.CharField(max_length=255)
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
+    geocoding_status = models.CharField(max_length=20, default='pending', choices=[('pending', 'Pending'), ('success', 'Success'), ('failed', 'Failed')])
+    geohash = models.CharField(max_length=GEOHASH_PRECISION, null=True, blank=True, editable=False)
     phone       = models.CharField(max_length=15, unique=True)
     profile_image = models.URLField(max_length=500)
     document = models.FileField(max_length=500, validators=[FileExtensionValidator(allowed_extensions=['pdf', 'doc', 'docx', 'jpg', 'jpeg', 'png'])])
@@ -39,9 +42,26 @@ class Workshop(AbstractBaseUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['name', 'location', 'phone', 'document']
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_active', 'is_approved', 'geohash'], name='workshop_active_geohash_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Keep the spatial index column in sync with the coordinates
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geohash_encode(self.latitude, self.longitude)
+        else:
+            self.geohash = None
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+
 
 class WorkshopOtp(models.Model):
     workshop = models.ForeignKey(Workshop, on_delete=models.CASCADE)
@@ -76,4 +96,16 @@ class WorkshopService(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"{self.workshop.name} - {self.name} ({'Approved' if self.is_approved else 'Pending'})"
\ No newline at end of file
+        return f"{self.workshop.name} - {self.name} ({'Approved' if self.is_approved else 'Pending'})"
+
+
+class GeocodeCache(models.Model):
+    address_key = models.CharField(max_length=255, unique=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.address_key} ({self.latitude}, {self.longitude})"
@@ -1,7 +1,16 @@
 from rest_framework import serializers
-from utils.s3_utils import generate_presigned_url
+from django.db import transaction
+from utils.s3_utils import get_cached_presigned_url, get_cached_presigned_urls
 from .models import Workshop, WorkshopService
-from .utils import get_coordinates
+from .tasks import geocode_workshop
+
+
+def schedule_geocoding(workshop):
+    # Geocode in the background once the row is committed. Robust, so a broker
+    # outage cannot fail a request whose write already went through; rows
+    # left pending are picked up by requeue_pending_geocoding
+    transaction.on_commit(lambda: geocode_workshop.delay(workshop.id), robust=True)
+
 
 class WorkshopSignupSerializer(serializers.ModelSerializer):
     class Meta:
@@ -12,40 +21,61 @@ class WorkshopSignupSerializer(serializers.ModelSerializer):
         }
 
     def create(self, validated_data):
-        location = validated_data.get('location')
-        latitude, longitude = get_coordinates(location)
-        if not latitude or not longitude:
-            raise serializers.ValidationError({"location": "Invalid location. Please provide a valid address."})
         # Pop the password and hash it before saving
         password = validated_data.pop('password')
-        validated_data['latitude'] = latitude
-        validated_data['longitude'] = longitude
-        # Save the workshop instance
-        workshop = Workshop(**validated_data)
+        # Save the workshop instance; coordinates are resolved asynchronously
+        workshop = Workshop(**validated_data, geocoding_status='pending')
         workshop.set_password(password)  # Hash the password
         workshop.save()
+        schedule_geocoding(workshop)
         return workshop
 
 class WorkshopLoginSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField()
 
+def get_document_key(workshop):
+    if hasattr(workshop.document, 'name'):
+        return workshop.document.name
+    return str(workshop.document)
+
+
+class WorkshopListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        # Batch-sign the documents of the whole page up front
+        workshops = list(data.all() if hasattr(data, 'all') else data)
+        self.child.presigned_urls = get_cached_presigned_urls(
+            [get_document_key(workshop) for workshop in workshops]
+        )
+        return super().to_representation(workshops)
+
+
 class WorkshopSerializer(serializers.ModelSerializer):
     document = serializers.SerializerMethodField()
 
     class Meta:
         model = Workshop
         fields = '__all__'
-        read_only_fields = ['profile_image', 'document']
+        read_only_fields = ['profile_image', 'document', 'geocoding_status']
+        list_serializer_class = WorkshopListSerializer
+
+    def update(self, instance, validated_data):
+        location_changed = 'location' in validated_data and validated_data['location'] != instance.location
+        if location_changed:
+            validated_data['geocoding_status'] = 'pending'
+        workshop = super().update(instance, validated_data)
+        if location_changed:
+            schedule_geocoding(workshop)
+        return workshop
 
     def get_document(self, obj):
-        # Generate presigned URL directly using the original document URL
-        if hasattr(obj.document, 'name'):
-            document_key = obj.document.name
-        else:
-            document_key = str(obj.document)
+        # Presigned URL for the original document, served from cache when possible
+        document_key = get_document_key(obj)
+        presigned_urls = getattr(self, 'presigned_urls', None) or {}
+        if document_key in presigned_urls:
+            return presigned_urls[document_key]
 
-        return generate_presigned_url(document_key)
+        return get_cached_presigned_url(document_key)
 
 
         
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from utils.principal_cache import invalidate_principal
+from .models import Workshop
+
+
+@receiver([post_save, post_delete], sender=Workshop)
+def invalidate_cached_workshop(sender, instance, **kwargs):
+    # Covers block/unblock, approval, profile and email changes
+    invalidate_principal('workshop', instance.pk)
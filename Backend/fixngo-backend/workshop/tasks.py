@@ -0,0 +1,53 @@
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from geopy.exc import GeocoderServiceError
+from .models import Workshop
+from .utils import get_coordinates
+
+GEOCODE_MAX_RETRIES = 5
+GEOCODE_RETRY_BACKOFF = 30  # seconds, doubled on every retry
+GEOCODE_RETRY_BACKOFF_MAX = 600
+
+
+@shared_task(bind=True, max_retries=GEOCODE_MAX_RETRIES)
+def geocode_workshop(self, workshop_id):
+    workshop = Workshop.objects.filter(id=workshop_id).first()
+    if not workshop:
+        return
+
+    try:
+        latitude, longitude = get_coordinates(workshop.location)
+    except GeocoderServiceError as exc:
+        if self.request.retries >= self.max_retries:
+            workshop.geocoding_status = 'failed'
+            workshop.save(update_fields=['geocoding_status'])
+            return
+        countdown = min(GEOCODE_RETRY_BACKOFF * 2 ** self.request.retries, GEOCODE_RETRY_BACKOFF_MAX)
+        raise self.retry(exc=exc, countdown=countdown)
+
+    if latitude is None or longitude is None:
+        workshop.geocoding_status = 'failed'
+        workshop.save(update_fields=['geocoding_status'])
+        return
+
+    workshop.latitude = latitude
+    workshop.longitude = longitude
+    workshop.geocoding_status = 'success'
+    workshop.save(update_fields=['latitude', 'longitude', 'geocoding_status'])
+
+
+@shared_task
+def requeue_pending_geocoding():
+    # Scheduled through CELERY_BEAT_SCHEDULE. Re-enqueues workshops whose
+    # geocoding job was never queued (broker down at signup) or was lost;
+    # the cutoff leaves rows alone while their own retries may still be running
+    cutoff = timezone.now() - timedelta(seconds=settings.GEOCODE_REQUEUE_AFTER)
+    workshop_ids = list(
+        Workshop.objects.filter(geocoding_status='pending', created_at__lt=cutoff)
+        .order_by('id').values_list('id', flat=True)[:settings.GEOCODE_REQUEUE_BATCH_SIZE]
+    )
+    for workshop_id in workshop_ids:
+        geocode_workshop.delay(workshop_id)
+    return len(workshop_ids)
@@ -1,3 +1,123 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from geopy.exc import GeocoderServiceError
+from rest_framework.test import APIClient
+
+from utils.principal_cache import get_principal, principal_cache_key
+
+from workshop import geocoders
+from workshop.geocoders import FixtureGeocoder
+from workshop.models import Workshop
+from workshop.serializers import schedule_geocoding
+from workshop.tasks import GEOCODE_MAX_RETRIES, geocode_workshop, requeue_pending_geocoding
+from workshop.tokens import WorkshopToken
+
+GEOCODER_FIXTURES = {
+    '12 MG Road, Kochi': (9.97, 76.28),
+    'Broker Street, Nowhere': GeocoderServiceError("service unavailable"),
+}
+
+
+@override_settings(
+    GEOCODER_BACKEND='workshop.geocoders.FixtureGeocoder',
+    GEOCODER_FIXTURES=GEOCODER_FIXTURES,
+)
+class GeocodeWorkshopTests(TestCase):
+    def setUp(self):
+        # The geocoder and its cache are built once per process
+        geocoders._geocoder = None
+        self.addCleanup(setattr, geocoders, '_geocoder', None)
+
+    def create_workshop(self, location, n=1):
+        return Workshop.objects.create(
+            name=f"geocoded {n}", email=f"geocoded{n}@example.com", phone=f"9200000{n:03d}",
+            location=location, geocoding_status='pending',
+        )
+
+    def test_resolved_address_succeeds(self):
+        workshop = self.create_workshop('12 MG Road, Kochi')
+        geocode_workshop.apply(args=[workshop.id])
+
+        workshop.refresh_from_db()
+        self.assertEqual(workshop.geocoding_status, 'success')
+        self.assertEqual((workshop.latitude, workshop.longitude), (9.97, 76.28))
+
+    def test_unknown_address_fails(self):
+        workshop = self.create_workshop('Unknown Lane, Atlantis')
+        geocode_workshop.apply(args=[workshop.id])
+
+        workshop.refresh_from_db()
+        self.assertEqual(workshop.geocoding_status, 'failed')
+        self.assertIsNone(workshop.latitude)
+
+    def test_service_errors_are_retried_then_fail(self):
+        workshop = self.create_workshop('Broker Street, Nowhere')
+        with mock.patch.object(FixtureGeocoder, 'geocode', autospec=True, side_effect=FixtureGeocoder.geocode) as geocode:
+            geocode_workshop.apply(args=[workshop.id])
+
+        self.assertEqual(geocode.call_count, GEOCODE_MAX_RETRIES + 1)
+        workshop.refresh_from_db()
+        self.assertEqual(workshop.geocoding_status, 'failed')
+
+    def test_broker_outage_does_not_fail_the_write(self):
+        workshop = self.create_workshop('12 MG Road, Kochi')
+        with mock.patch.object(geocode_workshop, 'delay', side_effect=ConnectionError("broker down")):
+            with self.captureOnCommitCallbacks(execute=True):
+                schedule_geocoding(workshop)
+
+        workshop.refresh_from_db()
+        self.assertEqual(workshop.geocoding_status, 'pending')
+
+    def test_stale_pending_workshops_are_requeued(self):
+        stale = self.create_workshop('12 MG Road, Kochi', n=1)
+        self.create_workshop('12 MG Road, Kochi', n=2)
+        Workshop.objects.filter(pk=stale.pk).update(created_at=timezone.now() - timedelta(days=1))
+
+        with mock.patch.object(geocode_workshop, 'delay') as delay:
+            self.assertEqual(requeue_pending_geocoding.apply().get(), 1)
+
+        delay.assert_called_once_with(stale.id)
+
+
+class PrincipalCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.workshop = Workshop.objects.create(
+            name="principal workshop", email="principal@example.com", phone="9500000000",
+            location="Kochi", document="documents/kyc.pdf", is_approved=True, approval_status="approved",
+        )
+        self.workshop.set_password('secret')
+        self.workshop.save()
+        cache.clear()
+
+    def test_cache_holds_only_auth_fields(self):
+        get_principal('workshop', self.workshop.id)
+
+        cached = cache.get(principal_cache_key('workshop', self.workshop.id))
+        self.assertEqual(cached['email'], "principal@example.com")
+        for secret in ('password', 'document', 'phone', 'location'):
+            self.assertNotIn(secret, cached)
+
+    def test_cached_principal_serves_auth_checks_without_queries(self):
+        get_principal('workshop', self.workshop.id)
+
+        with self.assertNumQueries(0):
+            principal = get_principal('workshop', self.workshop.id)
+            self.assertIsInstance(principal, Workshop)
+            self.assertEqual((principal.id, principal.is_active, principal.is_approved), (self.workshop.id, True, True))
+
+        # Anything else is loaded on demand
+        with self.assertNumQueries(1):
+            self.assertEqual(principal.location, "Kochi")
+
+    def test_profile_reads_the_full_row(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {WorkshopToken(self.workshop).access_token}")
+
+        response = client.get('/api/workshop/profile/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['location'], "Kochi")
@@ -1,15 +1,14 @@
-from geopy.geocoders import Nominatim
+from django.db.models import F, Q, Value, FloatField
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
 import math
+from .geocoders import get_geocoder
+import numpy as np
 
 def get_coordinates(address):
     """
-    Get latitude and longitude for a given address using the Geopy library.
+    Get latitude and longitude for a given address using the configured geocoder backend.
     """
-    geolocator = Nominatim(user_agent="fixngo") 
-    location = geolocator.geocode(address)
-    if location:
-        return location.latitude, location.longitude
-    return None, None
+    return get_geocoder().geocode(address)
 
 
 def haversine(lat1, lon1, lat2, lon2):
@@ -41,4 +40,172 @@ def haversine(lat1, lon1, lat2, lon2):
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
     distance = R * c
 
-    return distance
\ No newline at end of file
+    return distance
+
+
+def haversine_batch(lat, lon, latitudes, longitudes, radius_km=None, top_k=None):
+    """
+    Calculate the great-circle distances from one origin to many points in a
+    single vectorized pass.
+    
+    Parameters:
+    - lat, lon: Coordinates of the origin in decimal degrees
+    - latitudes, longitudes: Sequences (list, array or ndarray) of point coordinates
+    - radius_km: If given, only points within this distance are returned
+    - top_k: If given, only the k nearest points are returned, nearest first
+    
+    Returns:
+    - (indices, distances): numpy arrays of positions into the input sequences
+      and their distances in kilometers. Points keep their input order unless
+      top_k is given.
+    """
+    if None in (lat, lon):
+        raise ValueError("All coordinates must be valid numbers.")
+
+    R = 6371.0
+
+    lat1 = math.radians(float(lat))
+    lon1 = math.radians(float(lon))
+    lat2 = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon2 = np.radians(np.asarray(longitudes, dtype=np.float64))
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    distances = 2 * R * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    indices = np.arange(distances.shape[0])
+    if radius_km is not None:
+        mask = distances <= radius_km
+        indices = indices[mask]
+        distances = distances[mask]
+
+    if top_k is not None:
+        top_k = max(int(top_k), 0)
+        if top_k < distances.shape[0]:
+            # Partial selection first, so only k elements get fully sorted
+            nearest = np.argpartition(distances, top_k)[:top_k]
+            indices = indices[nearest]
+            distances = distances[nearest]
+        # Ties are broken by input position
+        order = np.lexsort((indices, distances))
+        indices = indices[order]
+        distances = distances[order]
+
+    return indices, distances
+
+
+def haversine_expression(latitude, longitude, lat_field="latitude", lon_field="longitude"):
+    """
+    Build a database expression computing the great-circle distance (km) from
+    the given point to each row, so filtering and ordering by distance can
+    happen inside the query instead of in Python.
+    """
+    R = 6371.0
+
+    origin_lat = Value(math.radians(float(latitude)), output_field=FloatField())
+    dlat = Radians(F(lat_field) - Value(float(latitude), output_field=FloatField()))
+    dlon = Radians(F(lon_field) - Value(float(longitude), output_field=FloatField()))
+
+    a = (
+        Power(Sin(dlat / 2), 2)
+        + Cos(origin_lat) * Cos(Radians(F(lat_field))) * Power(Sin(dlon / 2), 2)
+    )
+    # Clamp to 1 so rounding errors never push ASin out of its domain
+    return 2 * R * ASin(Sqrt(Least(a, Value(1.0, output_field=FloatField()))))
+
+# Geohash alphabet (base32 without a, i, l, o)
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Precision stored on Workshop.geohash (~4.8m x 4.8m cells)
+GEOHASH_PRECISION = 9
+
+KM_PER_DEGREE = 111.0
+
+
+def geohash_encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """
+    Encode a coordinate into a geohash string of the given precision.
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(geohash) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits = bits << 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits = bits << 1
+                lat_range[1] = mid
+
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(geohash)
+
+
+def geohash_cell_size(precision):
+    """
+    Return the (height, width) of a geohash cell in degrees.
+    """
+    total_bits = 5 * precision
+    lat_bits = total_bits // 2
+    lon_bits = total_bits - lat_bits
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def geohash_precision_for_radius(latitude, radius_km):
+    """
+    Pick the finest geohash precision whose cells are at least radius_km wide,
+    so that a cell and its eight neighbours always cover the search circle.
+    """
+    lon_scale = max(math.cos(math.radians(latitude)), 0.01)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = geohash_cell_size(precision)
+        if height * KM_PER_DEGREE >= radius_km and width * KM_PER_DEGREE * lon_scale >= radius_km:
+            return precision
+    return 1
+
+
+def geohash_neighbours(latitude, longitude, precision):
+    """
+    Return the geohash cell containing the coordinate plus its neighbours.
+    """
+    height, width = geohash_cell_size(precision)
+    cells = set()
+    for dlat in (-1, 0, 1):
+        for dlon in (-1, 0, 1):
+            lat = min(max(latitude + dlat * height, -90.0), 90.0)
+            lon = (longitude + dlon * width + 180.0) % 360.0 - 180.0
+            cells.add(geohash_encode(lat, lon, precision))
+    return cells
+
+
+def geohash_cells_query(latitude, longitude, radius_km, field="geohash"):
+    """
+    Build a Q object matching rows whose geohash falls in one of the cells
+    covering radius_km around the coordinate. Each cell becomes a prefix
+    range so the lookup can use a plain btree index.
+    """
+    precision = geohash_precision_for_radius(latitude, radius_km)
+    padding = GEOHASH_PRECISION - precision
+    query = Q()
+    for cell in sorted(geohash_neighbours(latitude, longitude, precision)):
+        query |= Q(**{f"{field}__range": (cell + "0" * padding, cell + "z" * padding)})
+    return query
@@ -1,6 +1,7 @@
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.exceptions import ValidationError
 from .serializers import WorkshopSignupSerializer, WorkshopLoginSerializer, WorkshopServiceSerializer, WorkshopSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
 from .models import Workshop, WorkshopOtp, WorkshopService
@@ -20,18 +21,21 @@ from django.utils.http import urlsafe_base64_encode
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_decode
 from rest_framework.generics import ListAPIView
-from users.models import ServiceRequest, Payment, Review
+from users.models import ServiceRequest, Review
 from users.serializers import ServiceRequestSerializer
-import socketio
-import requests
+from notifications.utils import notify
+from django.db import transaction
 from admin_side.views import CommonPagination
 from django.db.models import Sum, Count, Avg, Q
 from users.models import User
 from dateutil.relativedelta import relativedelta
 from django.db.models.functions import ExtractMonth, TruncMonth
 import logging
-from chat.models import Message
+from chat.models import Message, ArchivedMessage, ChatThread, parse_room_name
 from chat.serializers import MessageSerializer
+from chat.pagination import MessageCursorPagination
+from metrics.models import DailyMetrics
+from metrics.cache import cached_dashboard, workshop_scope
 from django.conf import settings
 
 
@@ -444,11 +448,7 @@ class UpdateServiceRequestStatusAPIView(APIView):
         else:
             service_request.rejection_reason = None
             
-        # Update the status
-        service_request.status = status
-        service_request.save()
-
-        # Send a real-time notification to the user
+        # Build the user's notification
         user_id = service_request.user.id
         service_name = service_request.workshop_service.name
         workshop_name = service_request.workshop.name
@@ -461,17 +461,11 @@ class UpdateServiceRequestStatusAPIView(APIView):
                 f"Reason: {rejection_reason}"
             )
                     
-        try:
-            response = requests.post(
-                "https://ws.fixngo.site/notification",
-                json={"user_id": user_id, "message": message},
-                headers={"Content-Type": "application/json"}
-            )
-            print(f"Notification response: {response.status_code}, {response.text}")  # Add this debug log
-            if response.status_code != 200:
-                print(f"Error sending notification: {response.text}")
-        except Exception as e:
-            print(f"Error notifying user {user_id}: {str(e)}")
+        # Update the status and queue the notification atomically
+        with transaction.atomic():
+            service_request.status = status
+            service_request.save()
+            notify(user_id, message)
 
         return Response({"message": f"Request {status} successfully"})
 
@@ -495,29 +489,20 @@ class SendPaymentRequestView(APIView):
             # Fetch the service request object
             service_request = ServiceRequest.objects.get(id=request_id)
             
-            # Update the total cost and set payment status
-            service_request.total_cost = total_cost
-            service_request.status = 'IN_PROGRESS'
-            service_request.payment_status = 'PENDING'
-            service_request.save()
-            
             user_id = service_request.user.id
             workshop_name = service_request.workshop.name
             message = (
             f"{workshop_name} has sent a payment request of ₹{total_cost} for your recent service."
             )
 
-            try:
-                response = requests.post(
-                    "https://ws.fixngo.site/notification",
-                    json={"user_id": user_id, "message": message},
-                    headers={"Content-Type": "application/json"}
-                )
-                print(f"Notification response: {response.status_code}, {response.text}")
-                if response.status_code != 200:
-                    print(f"Error sending notification: {response.text}")
-            except Exception as e:
-                print(f"Error notifying user {user_id}: {str(e)}")
+            # Update the total cost and payment status, and queue the
+            # notification, atomically
+            with transaction.atomic():
+                service_request.total_cost = total_cost
+                service_request.status = 'IN_PROGRESS'
+                service_request.payment_status = 'PENDING'
+                service_request.save()
+                notify(user_id, message)
             
             return Response(
                 {"message": "Payment request sent successfully.", 
@@ -538,34 +523,50 @@ class WorkshopDashboardAPIView(APIView):
     
     def get(self, request):
         workshop = request.user
+        return Response(cached_dashboard(workshop_scope(workshop.id), 'summary', lambda: self.build(workshop)))
+    
+    def build(self, workshop):
+        # Windows compared below, as calendar days
+        today = timezone.localdate()
+        last_month = today - timedelta(days=30)
+        previous_month = last_month - timedelta(days=30)
+        last_week = today - timedelta(days=7)
+        previous_week = last_week - timedelta(days=7)
         
-        # Get all service requests for this workshop
-        service_requests = ServiceRequest.objects.filter(workshop=workshop)
-        
-        # Total number of service requests
-        total_requests = service_requests.count()
-        
-        # Total pending service requests
-        total_pending = service_requests.filter(status='PENDING').count()
+        def since(start):
+            return Q(date__gte=start)
         
-        # Total completed service requests
-        total_completed = service_requests.filter(status='COMPLETED').count()
+        def between(start, end):
+            return Q(date__gte=start, date__lt=end)
         
-        # Total earnings (Sum of successful payments for this workshop)
-        successful_payments = Payment.objects.filter(
-            service_request__workshop=workshop,
-            status="SUCCESS"
+        # Everything comes from this workshop's rows of the daily rollup,
+        # one row per day with activity instead of one per request/payment
+        metrics = DailyMetrics.objects.filter(workshop=workshop).aggregate(
+            total_requests=Sum('requests'),
+            total_pending=Sum('requests_pending'),
+            total_completed=Sum('requests_completed'),
+            # Total earnings (workshop share of successful payments)
+            total_earnings=Sum('workshop_amount'),
+            last_month_requests=Sum('requests', filter=since(last_month)),
+            previous_month_requests=Sum('requests', filter=between(previous_month, last_month)),
+            last_week_pending=Sum('requests_pending', filter=since(last_week)),
+            previous_week_pending=Sum('requests_pending', filter=between(previous_week, last_week)),
+            last_month_completed=Sum('requests_completed', filter=since(last_month)),
+            previous_month_completed=Sum('requests_completed', filter=between(previous_month, last_month)),
+            last_month_earnings=Sum('revenue', filter=since(last_month)),
+            previous_month_earnings=Sum('revenue', filter=between(previous_month, last_month)),
         )
-        total_earnings = successful_payments.aggregate(total=Sum('workshop_amount'))['total'] or 0
+        metrics = {name: value or 0 for name, value in metrics.items()}
+        
+        total_requests = metrics['total_requests']
+        total_pending = metrics['total_pending']
+        total_completed = metrics['total_completed']
+        total_earnings = metrics['total_earnings']
         
         # Calculate changes from previous periods for context
         # Last month's service requests
-        last_month = timezone.now() - timedelta(days=30)
-        last_month_requests = service_requests.filter(created_at__gte=last_month).count()
-        previous_month_requests = service_requests.filter(
-            created_at__lt=last_month,
-            created_at__gte=last_month - timedelta(days=30)
-        ).count()
+        last_month_requests = metrics['last_month_requests']
+        previous_month_requests = metrics['previous_month_requests']
         
         # Calculate percentage change
         req_percent_change = 0
@@ -573,16 +574,8 @@ class WorkshopDashboardAPIView(APIView):
             req_percent_change = ((last_month_requests - previous_month_requests) / previous_month_requests) * 100
         
         # Last week's pending requests
-        last_week = timezone.now() - timedelta(days=7)
-        last_week_pending = service_requests.filter(
-            status='PENDING', 
-            created_at__gte=last_week
-        ).count()
-        previous_week_pending = service_requests.filter(
-            status='PENDING',
-            created_at__lt=last_week,
-            created_at__gte=last_week - timedelta(days=7)
-        ).count()
+        last_week_pending = metrics['last_week_pending']
+        previous_week_pending = metrics['previous_week_pending']
         
         # Calculate percentage change for pending
         pending_percent_change = 0
@@ -590,15 +583,8 @@ class WorkshopDashboardAPIView(APIView):
             pending_percent_change = ((last_week_pending - previous_week_pending) / previous_week_pending) * 100
         
         # Last month's completed requests
-        last_month_completed = service_requests.filter(
-            status='COMPLETED', 
-            created_at__gte=last_month
-        ).count()
-        previous_month_completed = service_requests.filter(
-            status='COMPLETED',
-            created_at__lt=last_month,
-            created_at__gte=last_month - timedelta(days=30)
-        ).count()
+        last_month_completed = metrics['last_month_completed']
+        previous_month_completed = metrics['previous_month_completed']
         
         # Calculate percentage change for completed
         completed_percent_change = 0
@@ -606,18 +592,15 @@ class WorkshopDashboardAPIView(APIView):
             completed_percent_change = ((last_month_completed - previous_month_completed) / previous_month_completed) * 100
         
         # Last month's earnings
-        last_month_earnings = successful_payments.filter(created_at__gte=last_month).aggregate(total=Sum('amount'))['total'] or 0
-        previous_month_earnings = successful_payments.filter(
-            created_at__lt=last_month,
-            created_at__gte=last_month - timedelta(days=30)
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        last_month_earnings = metrics['last_month_earnings']
+        previous_month_earnings = metrics['previous_month_earnings']
         
         # Calculate percentage change for earnings
         earnings_percent_change = 0
         if previous_month_earnings > 0:
             earnings_percent_change = ((last_month_earnings - previous_month_earnings) / previous_month_earnings) * 100
         
-        return Response({
+        return {
             "total_requests": total_requests,
             "total_pending": total_pending,
             "total_completed": total_completed,
@@ -626,7 +609,7 @@ class WorkshopDashboardAPIView(APIView):
             "pending_percent_change": round(pending_percent_change, 1),
             "completed_percent_change": round(completed_percent_change, 1),
             "earnings_percent_change": round(earnings_percent_change, 1)
-        })
+        }
 
 
 class ServiceRequestTrendsAPIView(APIView):
@@ -635,20 +618,22 @@ class ServiceRequestTrendsAPIView(APIView):
     
     def get(self, request):
         workshop = request.user
-        
+        return Response(cached_dashboard(workshop_scope(workshop.id), 'trends', lambda: self.build(workshop)))
+    
+    def build(self, workshop):
         # Get the current date and calculate the date one year ago
         today = timezone.now().date()
         one_year_ago = today - relativedelta(years=1)
         
-        # Query to get service requests grouped by month
-        service_requests = ServiceRequest.objects.filter(
+        # Service requests grouped by month, from the daily rollup
+        service_requests = DailyMetrics.objects.filter(
             workshop=workshop,
-            created_at__date__gte=one_year_ago,
-            created_at__date__lte=today
+            date__gte=one_year_ago,
+            date__lte=today
         ).annotate(
-            month=TruncMonth('created_at')
+            month=TruncMonth('date')
         ).values('month').annotate(
-            requests=Count('id')
+            requests=Sum('requests')
         ).order_by('month')
         
         # Map month numbers to month names
@@ -679,9 +664,9 @@ class ServiceRequestTrendsAPIView(APIView):
         # Reverse to get chronological order (oldest to newest)
         trends.reverse()
         
-        return Response({
+        return {
             "trends": trends
-        })
+        }
 
 
 class WorkshopRatingDistributionAPIView(APIView):
@@ -690,7 +675,9 @@ class WorkshopRatingDistributionAPIView(APIView):
     
     def get(self, request):
         workshop = request.user
-        
+        return Response(cached_dashboard(workshop_scope(workshop.id), 'ratings', lambda: self.build(workshop)))
+    
+    def build(self, workshop):
         # Get the rating distribution
         rating_distribution = Review.objects.filter(
             workshop=workshop
@@ -736,7 +723,7 @@ class WorkshopRatingDistributionAPIView(APIView):
         
         distribution['total_reviews'] = total_reviews
         
-        return Response(distribution)
+        return distribution
 
 class RecentActivityAPIView(APIView):
     authentication_classes = [WorkshopJWTAuthentication]
@@ -744,7 +731,9 @@ class RecentActivityAPIView(APIView):
     
     def get(self, request):
         workshop = request.user
-        
+        return Response(cached_dashboard(workshop_scope(workshop.id), 'activity', lambda: self.build(workshop)))
+    
+    def build(self, workshop):
         # Get the most recent service requests (last 10)
         recent_requests = ServiceRequest.objects.filter(
             workshop=workshop
@@ -770,9 +759,9 @@ class RecentActivityAPIView(APIView):
                 'vehicle_type': req.vehicle_type
             })
         
-        return Response({
+        return {
             "activities": activities
-        })
+        }
 
 
 class WorkshopServicesAPIView(APIView):
@@ -782,16 +771,14 @@ class WorkshopServicesAPIView(APIView):
     def get(self, request):
         workshop = request.user
         
-        # Get all services for this workshop
-        services = WorkshopService.objects.filter(workshop=workshop)
+        # Get all services for this workshop with their number of
+        # bookings, counted in the same query
+        services = WorkshopService.objects.filter(workshop=workshop).annotate(
+            bookings_count=Count('servicerequest')
+        )
         
-        # For each service, get the number of bookings
         result = []
         for service in services:
-            bookings_count = ServiceRequest.objects.filter(
-                workshop_service=service
-            ).count()
-            
             result.append({
                 'id': service.id,
                 'name': service.name,
@@ -801,7 +788,7 @@ class WorkshopServicesAPIView(APIView):
                 'is_available': service.is_available,
                 'service_type': service.service_type,
                 'created_at': service.created_at.isoformat(),
-                'bookings_count': bookings_count
+                'bookings_count': service.bookings_count
             })
         
         return Response(result)
@@ -870,7 +857,9 @@ class WorkshopProfileView(APIView):
     permission_classes = [IsWorkshopUser]
     
     def get(self, request):
-        workshop = request.user
+        # The authenticated principal only carries auth fields (see
+        # utils.principal_cache); the profile needs the whole row
+        workshop = Workshop.objects.get(pk=request.user.pk)
 
         # Check if the workshop is approved
         if not workshop.is_approved:
@@ -884,7 +873,7 @@ class WorkshopProfileView(APIView):
         return Response(serializer.data)
 
     def put(self, request):
-        workshop = request.user
+        workshop = Workshop.objects.get(pk=request.user.pk)
         email_changed = False
         new_email = request.data.get("email")
 
@@ -1057,16 +1046,26 @@ class WorkshopChatHistoryAPIView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
                 
-            # Construct the room name based on the convention
-            room_name = f"chat_{user_id}_{workshop.id}"
-            
-            # Get messages for this room
-            messages = Message.objects.filter(room_name=room_name)
+            # Get messages for this room by its typed key, with both
+            # participants joined in, one page at a time (see
+            # MessageCursorPagination for cursors). Older pages continue
+            # into the archive once the hot table is exhausted
+            participants = ('sender_user', 'sender_workshop', 'receiver_user', 'receiver_workshop')
+            messages = Message.objects.filter(
+                room_user_id=user.id, room_workshop_id=workshop.id
+            ).select_related(*participants)
+            archived = ArchivedMessage.objects.filter(
+                room_user_id=user.id, room_workshop_id=workshop.id
+            ).select_related(*participants)
+            paginator = MessageCursorPagination(archive=archived)
+            page = paginator.paginate_queryset(messages, request, view=self)
             
             # Serialize and return the messages
-            serializer = MessageSerializer(messages, many=True)
-            return Response(serializer.data)
+            serializer = MessageSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
             
+        except ValidationError as e:
+            return Response({"error": str(e.detail[0])}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response(
                 {"error": str(e)},
@@ -1085,60 +1084,42 @@ class WorkshopChatThreadsAPIView(APIView):
         try:
             workshop = request.user
             
-            # Fetch all messages involving the current workshop
-            workshop_messages = Message.objects.filter(
-                Q(sender_workshop=workshop) | Q(receiver_workshop=workshop)
-            )
-            
-            # Group by room_name to get unique threads
-            room_names = workshop_messages.values_list('room_name', flat=True).distinct()
-            
+            # Optional page window over the threads, newest first
+            try:
+                offset = max(int(request.GET.get('offset', 0)), 0)
+                limit = request.GET.get('limit')
+                limit = max(int(limit), 0) if limit is not None else None
+            except (TypeError, ValueError):
+                return Response({"error": "Invalid limit or offset"}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Thread summaries are maintained as messages are written, so the
+            # list is a single indexed read with the user joined in
+            chat_threads = ChatThread.objects.filter(
+                workshop=workshop, user__isnull=False
+            ).select_related('user').order_by('-last_timestamp', '-id')
+            chat_threads = chat_threads[offset:offset + limit] if limit is not None else chat_threads[offset:]
+
             threads = []
             
-            for room_name in room_names:
-                # Get the latest message for this thread
-                latest_message = workshop_messages.filter(room_name=room_name).order_by('-timestamp').first()
-                
-                # Skip if no message found
-                if not latest_message:
-                    continue
-                
-                # Determine which user the workshop is chatting with
-                user = None
-                if latest_message.sender_user:
-                    user = latest_message.sender_user
-                elif latest_message.receiver_user:
-                    user = latest_message.receiver_user
-                
-                if not user:
-                    continue
-
-                # Count unread messages in this thread
-                unread_count = workshop_messages.filter(
-                    room_name=room_name,
-                    receiver_workshop=workshop,
-                    is_read=False
-                ).count()
-                
+            for chat_thread in chat_threads:
+                user = chat_thread.user
+
                 # Build thread info
                 thread = {
-                    'id': room_name,
+                    'id': chat_thread.room_name,
                     'user_details': {
                         'id': user.id,
                         'username': user.email,
                         'profile_image_url': getattr(user, 'profile_image_url', '')
                     },
-                    'last_message': latest_message.message,
-                    'last_message_timestamp': latest_message.timestamp,
-                    'unread_count': unread_count,
-                    'created_at': latest_message.timestamp
+                    'last_message': chat_thread.last_message,
+                    'last_message_timestamp': chat_thread.last_timestamp,
+                    'unread_count': chat_thread.workshop_unread_count,
+                    'created_at': chat_thread.last_timestamp
                 }
                 
                 threads.append(thread)
             
-            # Sort threads by latest message timestamp (newest first)
-            threads.sort(key=lambda x: x['last_message_timestamp'], reverse=True)
-            
             return Response(threads)
 
         except Exception as e:
@@ -1155,18 +1136,16 @@ class WorkshopMarkMessagesReadView(APIView):
         try:
             workshop = request.user
             
-            # Parse room ID to extract user ID
+            # Validate the room ID
             # Format: chat_[user_id]_[workshop_id]
-            parts = room_id.split('_')
-            if len(parts) != 3:
+            try:
+                parse_room_name(room_id)
+            except ValueError:
                 return Response({"error": "Invalid room ID format"}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Mark all messages as read where the workshop is the receiver
-            Message.objects.filter(
-                room_name=room_id,
-                receiver_workshop=workshop,
-                is_read=False
-            ).update(is_read=True)
+            # Move the workshop's read watermark up to the latest message; a
+            # single-row write however many messages were unread
+            ChatThread.mark_read(room_id, workshop=workshop)
             
             return Response({"success": True})
             
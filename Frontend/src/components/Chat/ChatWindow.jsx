@@ -4,14 +4,50 @@ import { formatDistanceToNow } from "date-fns";
 import axiosInstance from "../../utils/axiosInstance";
 import { useSelector } from "react-redux";
 
+const RECONNECT_DELAY = 3000;
+// Presence expires after CHAT_PRESENCE_TTL (60s) on the server without traffic
+const HEARTBEAT_INTERVAL = 25000;
+// Matches CHAT_TYPING_THROTTLE; the server drops repeats inside it anyway
+const TYPING_THROTTLE = 2000;
+const TYPING_IDLE = 3000;
+// Incoming messages refresh the thread list at most this often
+const THREADS_REFRESH_DELAY = 2000;
+
+// Read a message-id cursor (before / since) out of a pagination link
+const cursorFrom = (link, param) => {
+  if (!link) return null;
+  try {
+    return new URL(link, window.location.origin).searchParams.get(param);
+  } catch (error) {
+    return null;
+  }
+};
+
 const ChatWindow = ({ chat, roomId, role, chatPartner, onClose, onMessageSent }) => {
   const [messages, setMessages] = useState([]);
   const [message, setMessage] = useState("");
   const [loading, setLoading] = useState(true);
+  const [loadingOlder, setLoadingOlder] = useState(false);
+  const [olderCursor, setOlderCursor] = useState(null);
   const [socketStatus, setSocketStatus] = useState("connecting");
   const [optimisticMessageId, setOptimisticMessageId] = useState(null);
+  const [partnerOnline, setPartnerOnline] = useState(false);
+  const [partnerTyping, setPartnerTyping] = useState(false);
   const chatRef = useRef();
   const socketRef = useRef(null);
+  // Newest stored message id we have, used to catch up after a reconnect
+  const lastMessageIdRef = useRef(null);
+  // Scroll position to restore after older messages are prepended
+  const scrollAnchorRef = useRef(null);
+  // Kept in a ref so a new callback from the parent doesn't reconnect the socket
+  const onMessageSentRef = useRef(onMessageSent);
+  // Our own typing state, sent over the socket
+  const typingRef = useRef({ active: false, sentAt: 0, idleTimer: null });
+  const threadsRefreshTimerRef = useRef(null);
+
+  useEffect(() => {
+    onMessageSentRef.current = onMessageSent;
+  }, [onMessageSent]);
 
   const loggedInUser = useSelector((state) => 
     role === 'workshop' 
@@ -33,6 +69,8 @@ const ChatWindow = ({ chat, roomId, role, chatPartner, onClose, onMessageSent })
     : (chatPartner?.profile_image_url);
     
   const chatPartnerId = chatPartner?.id;
+  // Presence id the server uses for the other side, e.g. `workshop:3`
+  const partnerMember = `${role === 'user' ? 'workshop' : 'user'}:${chatPartnerId}`;
 
   // Mark messages as read when chat window opens
   useEffect(() => {
@@ -50,7 +88,7 @@ const ChatWindow = ({ chat, roomId, role, chatPartner, onClose, onMessageSent })
       
       await axiosInstance.post(endpoint);
       // Refresh threads to update unread counts
-      if (onMessageSent) onMessageSent();
+      if (onMessageSentRef.current) onMessageSentRef.current();
     } catch (error) {
       console.error("Failed to mark messages as read:", error);
     }
@@ -63,11 +101,6 @@ const ChatWindow = ({ chat, roomId, role, chatPartner, onClose, onMessageSent })
       return;
     }
 
-    // Clean up any existing connection
-    if (socketRef.current) {
-      socketRef.current.close();
-    }
-
     let userId, workshopId;
     
     if (role === 'user') {
@@ -88,83 +121,153 @@ const ChatWindow = ({ chat, roomId, role, chatPartner, onClose, onMessageSent })
     const protocol = window.location.protocol === "https:" ? "wss" : "ws";
     const socketUrl = `${protocol}://${websocketDomain}/ws/chat/${userId}/${workshopId}/?token=${token}`;
 
-        
-    try {
-      socketRef.current = new WebSocket(socketUrl);
+    let closed = false;
+    let reconnectTimer;
+    let heartbeatTimer;
+    lastMessageIdRef.current = null;
 
-      socketRef.current.onopen = () => {
-        console.log("WebSocket connected");
-        setSocketStatus("connected");
-        // Load message history when connection opens
-        fetchChatHistory(userId, workshopId);
-      };
+    const connect = () => {
+      try {
+        const socket = new WebSocket(socketUrl);
+        socketRef.current = socket;
 
-      socketRef.current.onmessage = (event) => {
-        try {
-          const data = JSON.parse(event.data);
-          
-          // Handle chat_message type
-          if (data.type === "chat_message") {
-            setMessages((prevMessages) => {
-              // If this is our optimistic message being confirmed, replace it
-              if (optimisticMessageId && data.sender_id === loggedInUser.id && 
-                  prevMessages.some(m => m.message_id === optimisticMessageId && m.message === data.message)) {
-                // Remove optimistic message ID to prevent duplicates
-                setOptimisticMessageId(null);
-                // Replace temporary message with confirmed message
-                return prevMessages.map(msg => 
-                  msg.message_id === optimisticMessageId 
-                    ? { ...msg, message_id: data.message_id, timestamp: data.timestamp }
-                    : msg
-                );
+        socket.onopen = () => {
+          console.log("WebSocket connected");
+          setSocketStatus("connected");
+          // Keep our presence alive while the window sits idle
+          clearInterval(heartbeatTimer);
+          heartbeatTimer = setInterval(() => {
+            if (socket.readyState === WebSocket.OPEN) {
+              socket.send(JSON.stringify({ type: "heartbeat" }));
+            }
+          }, HEARTBEAT_INTERVAL);
+          // First connection loads the latest page; reconnects only fetch
+          // the messages sent while we were away
+          if (lastMessageIdRef.current === null) {
+            fetchChatHistory(userId, workshopId);
+          } else {
+            fetchMissedMessages(userId, workshopId);
+          }
+        };
+
+        socket.onmessage = (event) => {
+          try {
+            const data = JSON.parse(event.data);
+
+            // Presence and typing come over the socket, no polling needed
+            if (data.type === "presence_state") {
+              setPartnerOnline(data.online.includes(partnerMember));
+              return;
+            }
+            if (data.type === "presence_event") {
+              if (data.member === partnerMember) {
+                setPartnerOnline(data.status === "online");
+                if (data.status === "offline") setPartnerTyping(false);
               }
-              
-              // Check if message already exists in our list
-              const messageExists = prevMessages.some(msg => 
-                msg.message_id === data.message_id || 
-                (data.temporary_id && msg.message_id === data.temporary_id)
-              );
-
-              if (!messageExists) {
-                const newMsg = {
-                  message_id: data.message_id,
-                  message: data.message,
-                  sender_type: data.sender_id === loggedInUser.id ? "user" : "other",
-                  timestamp: data.timestamp || new Date().toISOString(),
-                };
-                return [...prevMessages, newMsg];
+              return;
+            }
+            if (data.type === "typing_event") {
+              if (data.member === partnerMember) setPartnerTyping(data.is_typing);
+              return;
+            }
+            
+            // Handle chat_message type
+            if (data.type === "chat_message") {
+              if (data.message_id) {
+                lastMessageIdRef.current = Math.max(lastMessageIdRef.current || 0, data.message_id);
               }
-              return prevMessages;
-            });
 
-            // Refresh chat threads when a new message is received
-            if (onMessageSent) {
-              onMessageSent();
+              setMessages((prevMessages) => {
+                // Our own optimistic message coming back: swap in the stored id
+                if (data.temporary_id && prevMessages.some(msg => msg.message_id === data.temporary_id)) {
+                  return prevMessages.map(msg => 
+                    msg.message_id === data.temporary_id 
+                      ? { ...msg, message_id: data.message_id || msg.message_id, timestamp: data.timestamp || msg.timestamp }
+                      : msg
+                  );
+                }
+                
+                // Check if message already exists in our list
+                const messageExists = prevMessages.some(msg => msg.message_id === data.message_id);
+
+                if (!messageExists) {
+                  const newMsg = {
+                    message_id: data.message_id,
+                    message: data.message,
+                    sender_type: data.sender_id === loggedInUser.id ? "user" : "other",
+                    timestamp: data.timestamp || new Date().toISOString(),
+                  };
+                  return [...prevMessages, newMsg];
+                }
+                return prevMessages;
+              });
+
+              // A message ends its sender's typing state
+              if (data.sender_id !== loggedInUser.id) setPartnerTyping(false);
+
+              // Refresh chat threads once per burst of incoming messages
+              clearTimeout(threadsRefreshTimerRef.current);
+              threadsRefreshTimerRef.current = setTimeout(() => {
+                if (onMessageSentRef.current) onMessageSentRef.current();
+              }, THREADS_REFRESH_DELAY);
             }
+          } catch (error) {
+            console.error("Error processing WebSocket message:", error);
           }
-        } catch (error) {
-          console.error("Error processing WebSocket message:", error);
-        }
-      };
+        };
 
-      socketRef.current.onclose = () => {
-        setSocketStatus("disconnected");
-      };
+        // Reconnect after drops until the window closes
+        socket.onclose = () => {
+          setSocketStatus("disconnected");
+          clearInterval(heartbeatTimer);
+          setPartnerOnline(false);
+          setPartnerTyping(false);
+          if (!closed) {
+            reconnectTimer = setTimeout(connect, RECONNECT_DELAY);
+          }
+        };
 
-      socketRef.current.onerror = () => {
+        socket.onerror = () => {
+          setSocketStatus("error");
+        };
+      } catch (error) {
+        console.error("Error creating WebSocket:", error);
         setSocketStatus("error");
-      };
-    } catch (error) {
-      console.error("Error creating WebSocket:", error);
-      setSocketStatus("error");
-    }
+      }
+    };
+
+    connect();
 
     return () => {
+      closed = true;
+      clearTimeout(reconnectTimer);
+      clearInterval(heartbeatTimer);
+      clearTimeout(threadsRefreshTimerRef.current);
+      clearTimeout(typingRef.current.idleTimer);
       if (socketRef.current) {
         socketRef.current.close();
       }
     };
-  }, [loggedInUser?.id, chatPartnerId, role, onMessageSent]);
+  }, [loggedInUser?.id, chatPartnerId, role]);
+
+  const historyEndpoint = (userId, targetId) =>
+    role === 'workshop' 
+      ? `/workshop/chat/history/${userId}/` // Workshop viewing history with a user
+      : `/users/chat/history/${targetId}/`; // User viewing history with a workshop
+
+  const formatHistory = (history) =>
+    history.map((msg) => ({
+      message_id: msg.id,
+      message: msg.message,
+      sender_type: msg.sender === loggedInUser.email ? "user" : "other",
+      timestamp: msg.timestamp,
+    }));
+
+  const trackLatest = (history) => {
+    if (history.length) {
+      lastMessageIdRef.current = Math.max(lastMessageIdRef.current || 0, history[history.length - 1].id);
+    }
+  };
 
   // Fetch chat history from backend
   const fetchChatHistory = async (userId, targetId) => {
@@ -177,23 +280,17 @@ const ChatWindow = ({ chat, roomId, role, chatPartner, onClose, onMessageSent })
         return;
       }
 
-      // Call the appropriate API endpoint based on role
-      const endpoint = role === 'workshop' 
-        ? `/workshop/chat/history/${userId}/` // Workshop viewing history with a user
-        : `/users/chat/history/${targetId}/`; // User viewing history with a workshop
-        
-      const response = await axiosInstance.get(endpoint);
-
-      if (response.data && Array.isArray(response.data)) {
-        const formattedMessages = response.data.map((msg) => ({
-          message_id: msg.id,
-          message: msg.message,
-          sender_type: msg.sender === loggedInUser.email ? "user" : "other",
-          timestamp: msg.timestamp,
-        }));
-        setMessages(formattedMessages);
+      // Latest page of the conversation, oldest first
+      const response = await axiosInstance.get(historyEndpoint(userId, targetId));
+      const history = response.data?.results;
+
+      if (history && Array.isArray(history)) {
+        trackLatest(history);
+        setMessages(formatHistory(history));
+        setOlderCursor(cursorFrom(response.data.previous, "before"));
       } else {
         setMessages([]);
+        setOlderCursor(null);
       }
     } catch (error) {
       console.error("Failed to fetch chat history:", error);
@@ -203,6 +300,65 @@ const ChatWindow = ({ chat, roomId, role, chatPartner, onClose, onMessageSent })
     }
   };
 
+  // After a reconnect, fetch only what arrived since the newest message we
+  // have, following `next` until caught up
+  const fetchMissedMessages = async (userId, targetId) => {
+    try {
+      let since = lastMessageIdRef.current;
+      while (since) {
+        const response = await axiosInstance.get(historyEndpoint(userId, targetId), { params: { since } });
+        const history = response.data?.results || [];
+        if (history.length) {
+          trackLatest(history);
+          const missed = formatHistory(history);
+          setMessages((prevMessages) => {
+            const known = new Set(prevMessages.map(msg => msg.message_id));
+            return [...prevMessages, ...missed.filter(msg => !known.has(msg.message_id))];
+          });
+        }
+        since = cursorFrom(response.data?.next, "since");
+      }
+    } catch (error) {
+      console.error("Failed to catch up on chat history:", error);
+    }
+  };
+
+  // Load the page before the oldest message shown
+  const loadOlderMessages = async () => {
+    if (!olderCursor || loadingOlder) return;
+
+    let userId, targetId;
+    if (role === 'user') {
+      userId = loggedInUser.id;
+      targetId = chatPartnerId;
+    } else {
+      userId = chatPartnerId;
+      targetId = loggedInUser.id;
+    }
+
+    try {
+      setLoadingOlder(true);
+      const response = await axiosInstance.get(historyEndpoint(userId, targetId), { params: { before: olderCursor } });
+      const history = response.data?.results || [];
+
+      if (chatRef.current) {
+        scrollAnchorRef.current = {
+          height: chatRef.current.scrollHeight,
+          top: chatRef.current.scrollTop,
+        };
+      }
+      setMessages((prevMessages) => {
+        const known = new Set(prevMessages.map(msg => msg.message_id));
+        return [...formatHistory(history).filter(msg => !known.has(msg.message_id)), ...prevMessages];
+      });
+      setOlderCursor(cursorFrom(response.data?.previous, "before"));
+    } catch (error) {
+      console.error("Failed to load older messages:", error);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   // Send a new message
   const sendMessage = () => {
     if (!message.trim() || !socketRef.current) {
@@ -233,11 +389,40 @@ const ChatWindow = ({ chat, roomId, role, chatPartner, onClose, onMessageSent })
 
       setMessages((prevMessages) => [...prevMessages, tempMsg]);
       setMessage("");
+      // The server ends our typing state when the message arrives
+      clearTimeout(typingRef.current.idleTimer);
+      typingRef.current.active = false;
     } else {
       alert("Connection lost. Please refresh the page.");
     }
   };
 
+  // Tell the other side we're typing: re-announced at most every
+  // TYPING_THROTTLE, and withdrawn after TYPING_IDLE without keystrokes
+  const sendTyping = (isTyping) => {
+    const typing = typingRef.current;
+    if (socketRef.current?.readyState !== WebSocket.OPEN) return;
+    const now = Date.now();
+    if (isTyping && typing.active && now - typing.sentAt < TYPING_THROTTLE) return;
+    if (!isTyping && !typing.active) return;
+
+    typing.active = isTyping;
+    typing.sentAt = now;
+    socketRef.current.send(JSON.stringify({ type: "typing", is_typing: isTyping }));
+  };
+
+  const handleMessageChange = (e) => {
+    setMessage(e.target.value);
+    const typing = typingRef.current;
+    clearTimeout(typing.idleTimer);
+    if (e.target.value.trim()) {
+      sendTyping(true);
+      typing.idleTimer = setTimeout(() => sendTyping(false), TYPING_IDLE);
+    } else {
+      sendTyping(false);
+    }
+  };
+
   // Handle Enter key press to send message
   const handleKeyPress = (e) => {
     if (e.key === "Enter" && !e.shiftKey) {
@@ -246,9 +431,15 @@ const ChatWindow = ({ chat, roomId, role, chatPartner, onClose, onMessageSent })
     }
   };
 
-  // Auto-scroll to the latest message
+  // Auto-scroll to the latest message, or keep the reader's place when
+  // older messages were added above
   useEffect(() => {
-    if (chatRef.current) {
+    if (!chatRef.current) return;
+    const anchor = scrollAnchorRef.current;
+    if (anchor) {
+      chatRef.current.scrollTop = chatRef.current.scrollHeight - anchor.height + anchor.top;
+      scrollAnchorRef.current = null;
+    } else {
       chatRef.current.scrollTop = chatRef.current.scrollHeight;
     }
   }, [messages]);
@@ -266,9 +457,16 @@ const ChatWindow = ({ chat, roomId, role, chatPartner, onClose, onMessageSent })
               // e.target.src = "/default-avatar.png";
             }}
           />
-          <span className="font-semibold truncate">
-            {chatPartnerName}
-          </span>
+          <div className="flex flex-col min-w-0">
+            <span className="font-semibold truncate">
+              {chatPartnerName}
+            </span>
+            {socketStatus === "connected" && (
+              <span className="text-xs text-gray-300">
+                {partnerTyping ? "typing..." : partnerOnline ? "Online" : "Offline"}
+              </span>
+            )}
+          </div>
         </div>
         <div className="flex items-center space-x-2">
           {socketStatus !== "connected" && (
@@ -292,7 +490,20 @@ const ChatWindow = ({ chat, roomId, role, chatPartner, onClose, onMessageSent })
             <span>No messages yet. Start the conversation!</span>
           </div>
         ) : (
-          messages.map((msg, index) => (
+          <>
+          {olderCursor && (
+            <div className="flex justify-center mb-2">
+              <button
+                type="button"
+                onClick={loadOlderMessages}
+                disabled={loadingOlder}
+                className="text-xs text-blue-500 hover:underline disabled:text-gray-400"
+              >
+                {loadingOlder ? "Loading..." : "Load older messages"}
+              </button>
+            </div>
+          )}
+          {messages.map((msg, index) => (
             <div
               key={msg.message_id || index}
               className={`p-2 mb-2 max-w-[80%] rounded-lg ${
@@ -310,7 +521,8 @@ const ChatWindow = ({ chat, roomId, role, chatPartner, onClose, onMessageSent })
                   : "Just now"}
               </div>
             </div>
-          ))
+          ))}
+          </>
         )}
       </div>
 
@@ -326,7 +538,7 @@ const ChatWindow = ({ chat, roomId, role, chatPartner, onClose, onMessageSent })
           placeholder="Type a message..."
           className="flex-1 px-3 py-2 border border-gray-300 rounded-full focus:outline-none"
           value={message}
-          onChange={(e) => setMessage(e.target.value)}
+          onChange={handleMessageChange}
           onKeyPress={handleKeyPress}
           disabled={socketStatus !== "connected"}
         />
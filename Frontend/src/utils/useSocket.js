@@ -1,49 +1,61 @@
-import { useEffect, useCallback } from 'react';
-import io from 'socket.io-client';
+import { useEffect, useRef } from 'react';
 
-let socket;
+const websocketDomain = "chat.fixngo.site";  // backend websocket nginx domain
+const RECONNECT_DELAY = 3000;
 
 function useSocket(userId, callback) {
+    const socketRef = useRef(null);
+
     useEffect(() => {
-        // Initialize socket connection if it doesn't exist
-        if (!socket) {
-            socket = io('https://ws.fixngo.site', {
-                transports: ['websocket'],
-                reconnection: true,
-            });
+        if (!userId) {
+            return;
         }
 
-        if (userId) {
-            const event = `notification_${userId}`;
-            
-            // Handler function
-            const handleNotification = (data) => {
-                console.log(`Received notification for ${event}:`, data);
-                if (callback) {
+        let closed = false;
+        let reconnectTimer;
+
+        const connect = () => {
+            const token = localStorage.getItem("token");
+            const protocol = window.location.protocol === "https:" ? "wss" : "ws";
+            const socket = new WebSocket(`${protocol}://${websocketDomain}/ws/notifications/?token=${token}`);
+            socketRef.current = socket;
+
+            socket.onopen = () => {
+                console.log('Socket for notification connected successfully');
+            };
+
+            socket.onmessage = (event) => {
+                const data = JSON.parse(event.data);
+                if (data.type === "notification" && callback) {
                     callback(data);
                 }
             };
 
-            // Register event listener
-            socket.on(event, handleNotification);
-            
-            // Verify connection
-            socket.on('connect', () => {
-                console.log('Socket for notification connected successfully');
-            });
-
-            socket.on('connect_error', (error) => {
+            socket.onerror = (error) => {
                 console.error('Socket connection error:', error);
-            });
+            };
 
-            // Cleanup function
-            return () => {
-                socket.off(event, handleNotification);
+            // Reconnect after drops until the component unmounts
+            socket.onclose = () => {
+                if (!closed) {
+                    reconnectTimer = setTimeout(connect, RECONNECT_DELAY);
+                }
             };
-        }
+        };
+
+        connect();
+
+        // Cleanup function
+        return () => {
+            closed = true;
+            clearTimeout(reconnectTimer);
+            if (socketRef.current) {
+                socketRef.current.close();
+            }
+        };
     }, [userId, callback]);
 
-    return socket;
+    return socketRef.current;
 }
 
-export default useSocket;
\ No newline at end of file
+export default useSocket;